@@ -27,29 +27,62 @@ Controls:
 
 import cv2
 import numpy as np
-from picamera2 import Picamera2
+from picamera2 import Picamera2, MappedArray
 import time
 import argparse
 from dataclasses import dataclass
-from typing import List, Tuple, Optional, Dict
+from typing import Tuple, Optional, Dict
 import os
+import threading
 from datetime import datetime
+from functools import lru_cache
+
+from aruco_detection import tuned_parameters
+
+
+@lru_cache(maxsize=256)
+def _label_text_size(label: str) -> Tuple[int, int]:
+    """Size of a marker label (labels repeat, so each is measured once)."""
+    return cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
+
+
+# Marker type codes stored in MarkerBatch.types
+TYPE_CORNER, TYPE_PLAYER, TYPE_ITEM, TYPE_CUSTOM = range(4)
 
 
 @dataclass
-class DetectedMarker:
-    """Represents a detected ArUco marker with metadata."""
-    id: int
-    center: Tuple[int, int]
-    corners: List[Tuple[int, int]]
-    is_corner: bool
-    confidence: float
-    marker_type: str
+class MarkerBatch:
+    """Detected ArUco markers for one frame, stored as parallel arrays."""
+    ids: np.ndarray          # (N,) marker IDs
+    centers: np.ndarray      # (N, 2) int32 center points
+    corners: np.ndarray      # (N, 4, 2) int32 corner points
+    confidences: np.ndarray  # (N,) float confidence values
+    types: np.ndarray        # (N,) uint8 TYPE_* codes
+    
+    @classmethod
+    def empty(cls) -> 'MarkerBatch':
+        """Batch with no markers."""
+        return cls(ids=np.empty(0, dtype=np.int32),
+                   centers=np.empty((0, 2), dtype=np.int32),
+                   corners=np.empty((0, 4, 2), dtype=np.int32),
+                   confidences=np.empty(0, dtype=np.float32),
+                   types=np.empty(0, dtype=np.uint8))
+    
+    def __len__(self) -> int:
+        return len(self.ids)
 
 
 class ArucoPreviewApp:
     """Camera preview application with ArUco marker overlays."""
     
+    # Short item names indexed by marker ID - 30 (None = unnamed ID in the item range)
+    _ITEM_NAMES = (
+        "Gob", "Orc", "Ske", "Drg", "Trl", "Wiz", "Bst", "Dem", None, None,
+        "Chr", "Mag", "Gld", "Pot", "Wpn", "Arm", "Scr", "Key", None, None,
+        "Mer", "Grd", "Nob", "Inn", "Pri", "Dor", "Trp", "Fir", "Alt", "Por",
+        "Veh", "Obj"
+    )
+    
     def __init__(self, fps: float = 1.0, resolution: Tuple[int, int] = (1280, 720)):
         self.picam = None
         self.fps = fps
@@ -67,7 +100,7 @@ class ArucoPreviewApp:
         # Use new ArucoDetector class if available (OpenCV 4.7+)
         if opencv_major > 4 or (opencv_major == 4 and opencv_minor >= 7):
             try:
-                self.parameters = cv2.aruco.DetectorParameters()
+                self.parameters = tuned_parameters(cv2.aruco.DetectorParameters())
                 self.detector = cv2.aruco.ArucoDetector(self.dictionary, self.parameters)
                 self.use_new_api = True
                 print(f"Using new ArUco API (OpenCV {self.opencv_version})")
@@ -75,15 +108,35 @@ class ArucoPreviewApp:
                 self.detector = None
                 self.use_new_api = False
                 # Older OpenCV versions use DetectorParameters_create()
-                self.parameters = cv2.aruco.DetectorParameters_create()
+                self.parameters = tuned_parameters(cv2.aruco.DetectorParameters_create())
                 print(f"Falling back to legacy ArUco API (OpenCV {self.opencv_version})")
         else:
             self.detector = None
             self.use_new_api = False
             # Older OpenCV versions use DetectorParameters_create()
-            self.parameters = cv2.aruco.DetectorParameters_create()
+            self.parameters = tuned_parameters(cv2.aruco.DetectorParameters_create())
             print(f"Using legacy ArUco API (OpenCV {self.opencv_version})")
         
+        # Detection runs on a frame downscaled by this factor (1 = full resolution).
+        # 2 halves the detection cost but loses markers under ~32px per side.
+        self.detect_scale = 1
+        
+        # Run downscaling and detection through OpenCL (UMat) when available
+        self.use_opencl = False
+        
+        # Between full-frame scans, only search around the last known markers.
+        # Newly placed markers are only found by a full scan, so one runs at least
+        # every full_scan_period seconds (every frame at low frame rates).
+        self.full_scan_interval = 10
+        self.full_scan_period = 1.0
+        self._tracked_corners = None  # (N, 4, 2) corners in detection coordinates
+        self._frames_since_full_scan = 0
+        self._last_full_scan = 0.0    # time.monotonic() of the last full scan
+        self._roi_detector = None     # (window size, detector, parameters)
+        
+        # Draw and show the preview window (False = headless, detection only)
+        self.display_enabled = True
+        
         # Detection toggles
         self.detect_corners = True
         self.detect_players = True
@@ -119,6 +172,27 @@ class ArucoPreviewApp:
         
         # Frame saving
         self.save_counter = 0
+        
+        # Dashed outline masks, rendered once per (shape, size, thickness)
+        self._dashed_stamps = {}
+        
+        # Pre-rendered opaque panels
+        self._info_sprite = None
+        self._help_sprite = None
+        self._help_sprite_key = None
+        self._info_time_sec = None
+        self._info_time_line = ""
+        
+        # Background capture: only the newest frame is kept. Frames are copied into
+        # a pool of three reused buffers: the one being processed, the newest
+        # one and the one being written.
+        self._frame_pool = []
+        self._latest_frame = None
+        self._frame_in_use = None
+        self._frame_lock = threading.Lock()
+        self._frame_event = threading.Event()
+        self._capturing = False
+        self._capture_thread = None
     
     def initialize_camera(self) -> bool:
         """Initialize the Raspberry Pi camera."""
@@ -127,13 +201,20 @@ class ArucoPreviewApp:
             
             # Configure camera for preview
             config = self.picam.create_preview_configuration(
-                main={"size": self.resolution, "format": "RGB888"}
+                main={"size": self.resolution, "format": "YUV420"}
             )
             self.picam.configure(config)
             self.picam.start()
             
-            # Allow camera to warm up
-            time.sleep(2)
+            # Allow camera to warm up, doing first-use setup in the meantime
+            warm_until = time.monotonic() + 2
+            self._prewarm()
+            time.sleep(max(0.0, warm_until - time.monotonic()))
+            
+            # Capture continuously so frame grabs overlap detection and drawing
+            self._capturing = True
+            self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+            self._capture_thread.start()
             print(f"Camera initialized: {self.resolution[0]}x{self.resolution[1]} @ {self.fps} FPS")
             print(f"OpenCV version: {self.opencv_version}")
             print(f"ArUco API: {'New (4.7+)' if self.use_new_api else 'Legacy (<4.7)'}")
@@ -143,74 +224,211 @@ class ArucoPreviewApp:
             print(f"Failed to initialize camera: {e}")
             return False
     
-    def detect_aruco_markers(self, frame: np.ndarray) -> List[DetectedMarker]:
+    def _prewarm(self):
+        """Build detector state, stamps, label sizes and panels on a blank frame."""
+        width, height = self.resolution
+        blank = np.zeros((height * 3 // 2, width), dtype=np.uint8)  # YUV420 layout
+        self.detect_aruco_markers(blank)
+        
+        display = self.frame_to_display(blank)
+        self.draw_info_overlay(display, MarkerBatch.empty())
+        self.draw_help_overlay(display)
+        
+        for shape in ('circle', 'square'):
+            self._dashed_stamp(shape, 20, 2)
+        for player_num in range(1, self.player_id_range[1] - self.player_id_range[0] + 2):
+            _label_text_size(f"P{player_num}")
+        for name in self._ITEM_NAMES:
+            if name:
+                _label_text_size(name)
+    
+    def _capture_loop(self):
+        """Capture frames in the background, replacing the previous one."""
+        while self._capturing:
+            try:
+                request = self.picam.capture_request()
+                try:
+                    with MappedArray(request, "main") as mapped:
+                        frame = self._next_pool_buffer(mapped.array)
+                        np.copyto(frame, mapped.array)
+                finally:
+                    request.release()
+            except Exception as e:
+                print(f"Frame capture failed: {e}")
+                self._capturing = False  # Lets run() notice and exit
+                break
+            with self._frame_lock:
+                self._latest_frame = frame
+            self._frame_event.set()
+    
+    def _next_pool_buffer(self, like: np.ndarray) -> np.ndarray:
+        """Get a pooled frame buffer that is neither the newest nor being processed."""
+        if not self._frame_pool or self._frame_pool[0].shape != like.shape:
+            self._frame_pool = [np.empty_like(like) for _ in range(3)]
+        with self._frame_lock:
+            for buffer in self._frame_pool:
+                if buffer is not self._latest_frame and buffer is not self._frame_in_use:
+                    return buffer
+    
+    def frame_to_gray(self, frame: np.ndarray) -> np.ndarray:
+        """Get the grayscale image used for detection from a camera frame."""
+        if frame.ndim == 2:
+            # YUV420: the Y plane is the top width x height of the buffer
+            width, height = self.resolution
+            return frame[:height, :width]
+        return cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+    
+    def frame_to_display(self, frame: np.ndarray) -> np.ndarray:
+        """Get a new BGR image for drawing and display from a camera frame."""
+        if frame.ndim == 2:
+            return cv2.cvtColor(frame, cv2.COLOR_YUV2BGR_I420)
+        return frame.copy()
+    
+    def detect_aruco_markers(self, frame: np.ndarray) -> MarkerBatch:
         """Detect and classify ArUco markers in the frame."""
-        # Convert to grayscale for detection
-        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-        
+        # Grayscale view of the frame for detection
+        gray = self.frame_to_gray(frame)
+        if self.use_opencl:
+            gray = cv2.UMat(gray)
+        
+        # Downscale for detection; corners are scaled back up below
+        if self.detect_scale == 2:
+            gray = cv2.pyrDown(gray)
+        elif self.detect_scale != 1:
+            gray = cv2.resize(gray, None, fx=1.0 / self.detect_scale, fy=1.0 / self.detect_scale,
+                              interpolation=cv2.INTER_AREA)
+        
+        # Search around the previous markers; fall back to a full scan
+        # periodically or as soon as one of them is lost
+        all_corners = None
+        now = time.monotonic()
+        if (not self.use_opencl and self._tracked_corners is not None
+                and len(self._tracked_corners) > 0
+                and self._frames_since_full_scan < self.full_scan_interval
+                and now - self._last_full_scan < self.full_scan_period):
+            tracked = self._detect_in_rois(gray, self._tracked_corners)
+            if tracked is not None and len(tracked[1]) >= len(self._tracked_corners):
+                all_corners, marker_ids = tracked
+                self._frames_since_full_scan += 1
+        
+        if all_corners is None:
+            all_corners, marker_ids = self._run_detector(gray)
+            self._frames_since_full_scan = 1
+            self._last_full_scan = now
+        self._tracked_corners = all_corners
+        
+        if len(marker_ids) == 0:
+            return MarkerBatch.empty()
+        
+        # Scale corners back up to full resolution
+        if self.detect_scale != 1:
+            all_corners = all_corners * self.detect_scale
+        centers = all_corners.mean(axis=1).astype(np.int32)
+        
+        # Confidence from marker area (shoelace formula); larger = more confident
+        x = all_corners[:, :, 0]
+        y = all_corners[:, :, 1]
+        areas = 0.5 * np.abs(np.sum(x * np.roll(y, -1, axis=1) - y * np.roll(x, -1, axis=1), axis=1))
+        confidences = np.minimum(1.0, areas / 10000.0)
+        
+        # Penalize non-square markers: shortest side / longest side
+        sides = np.linalg.norm(all_corners - np.roll(all_corners, -1, axis=1), axis=2)
+        longest = sides.max(axis=1)
+        square = longest > 0
+        confidences[square] *= sides.min(axis=1)[square] / longest[square]
+        
+        # Classify all markers at once
+        is_corner = np.isin(marker_ids, list(self.corner_mapping))
+        is_player = (marker_ids >= self.player_id_range[0]) & (marker_ids <= self.player_id_range[1])
+        is_item = (marker_ids >= self.item_id_range[0]) & (marker_ids <= self.item_id_range[1])
+        marker_types = np.select([is_corner, is_player, is_item],
+                                 [TYPE_CORNER, TYPE_PLAYER, TYPE_ITEM], TYPE_CUSTOM).astype(np.uint8)
+        
+        return MarkerBatch(ids=marker_ids, centers=centers,
+                           corners=all_corners.astype(np.int32),
+                           confidences=confidences, types=marker_types)
+    
+    def _run_detector(self, image, detector=None, parameters=None) -> Tuple[np.ndarray, np.ndarray]:
+        """Run the ArUco detector; returns (N, 4, 2) float32 corners and (N,) IDs."""
         # Detect markers using appropriate API
         if self.use_new_api and self.detector is not None:
             # New API (OpenCV 4.7+)
-            corners, ids, rejected = self.detector.detectMarkers(gray)
+            corners, ids, rejected = (detector or self.detector).detectMarkers(image)
         else:
             # Legacy API (OpenCV < 4.7)
             corners, ids, rejected = cv2.aruco.detectMarkers(
-                image=gray, dictionary=self.dictionary, parameters=self.parameters)
-        
-        detected_markers = []
-        if ids is not None:
-            for i, marker_id in enumerate(ids.flatten()):
-                # Get marker corners
-                marker_corners = corners[i][0]  # Shape: (4, 2)
-                corner_points = [(int(x), int(y)) for x, y in marker_corners]
-                
-                # Calculate center point
-                center_x = int(np.mean(marker_corners[:, 0]))
-                center_y = int(np.mean(marker_corners[:, 1]))
-                center = (center_x, center_y)
-                
-                # Calculate confidence based on marker area and shape quality
-                marker_area = cv2.contourArea(marker_corners)
-                # Simple confidence metric based on area (larger = more confident)
-                confidence = min(1.0, marker_area / 10000.0)
-                
-                # Additional confidence check: how square is the marker?
-                rect = cv2.minAreaRect(marker_corners)
-                width, height = rect[1]
-                if width > 0 and height > 0:
-                    aspect_ratio = min(width, height) / max(width, height)
-                    confidence *= aspect_ratio  # Penalize non-square markers
-                
-                # Determine marker type
-                is_corner = marker_id in self.corner_mapping
-                if is_corner:
-                    marker_type = 'corner'
-                elif self.player_id_range[0] <= marker_id <= self.player_id_range[1]:
-                    marker_type = 'player'
-                elif self.item_id_range[0] <= marker_id <= self.item_id_range[1]:
-                    marker_type = 'item'
-                else:
-                    marker_type = 'custom'
-                
-                detected_marker = DetectedMarker(
-                    id=marker_id,
-                    center=center,
-                    corners=corner_points,
-                    is_corner=is_corner,
-                    confidence=confidence,
-                    marker_type=marker_type
-                )
-                detected_markers.append(detected_marker)
-        
-        return detected_markers
-    
-    def update_surface_calibration(self, detected_markers: List[DetectedMarker]):
+                image=image, dictionary=self.dictionary, parameters=parameters or self.parameters)
+        
+        # Download OpenCL results for the NumPy code below
+        if isinstance(ids, cv2.UMat):
+            ids = ids.get()
+            corners = [c.get() for c in corners]
+        
+        if ids is None:
+            return np.empty((0, 4, 2), dtype=np.float32), np.empty(0, dtype=np.int32)
+        
+        return np.asarray(corners, dtype=np.float32).reshape(-1, 4, 2), ids.flatten()
+    
+    def _detect_in_rois(self, gray: np.ndarray,
+                        previous: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Detect markers only in padded windows around previously found markers.
+        
+        Returns None when the windows would cover most of the frame anyway.
+        """
+        height, width = gray.shape[:2]
+        
+        # Equal-sized windows three markers wide, so moved tokens are still inside them
+        extent = (previous.max(axis=1) - previous.min(axis=1)).max()
+        window = int(3 * extent) // 32 * 32 + 32
+        if len(previous) * window * window > 0.5 * width * height:
+            return None
+        centers = previous.mean(axis=1)
+        x0, y0 = np.maximum(centers - window / 2, 0).astype(np.int32).T.tolist()
+        
+        # Perimeter limits are relative to image size; rescale them to the window
+        # so the small crops do not accept far more noise candidates than a full scan
+        if self._roi_detector is None or self._roi_detector[0] != window:
+            if self.use_new_api and self.detector is not None:
+                parameters = cv2.aruco.DetectorParameters()
+            else:
+                parameters = cv2.aruco.DetectorParameters_create()
+            rescale = max(width, height) / window
+            tuned_parameters(
+                parameters,
+                minMarkerPerimeterRate=min(self.parameters.minMarkerPerimeterRate * rescale, 4.0),
+                maxMarkerPerimeterRate=min(self.parameters.maxMarkerPerimeterRate * rescale, 4.0))
+            detector = (cv2.aruco.ArucoDetector(self.dictionary, parameters)
+                        if self.use_new_api and self.detector is not None else None)
+            self._roi_detector = (window, detector, parameters)
+        _, detector, parameters = self._roi_detector
+        
+        found_corners = []
+        found_ids = []
+        for rx0, ry0 in zip(x0, y0):
+            roi = gray[ry0:ry0 + window, rx0:rx0 + window]
+            corners, ids = self._run_detector(roi, detector, parameters)
+            if len(ids):
+                corners += (rx0, ry0)
+                found_corners.append(corners)
+                found_ids.append(ids)
+        
+        if not found_ids:
+            return np.empty((0, 4, 2), dtype=np.float32), np.empty(0, dtype=np.int32)
+        
+        # Neighbouring windows can overlap; keep one detection per ID
+        all_ids = np.concatenate(found_ids)
+        _, keep = np.unique(all_ids, return_index=True)
+        keep.sort()
+        return np.concatenate(found_corners)[keep], all_ids[keep]
+    
+    def update_surface_calibration(self, markers: MarkerBatch):
         """Update surface calibration based on corner markers."""
         # Update corner marker positions
-        for marker in detected_markers:
-            if marker.is_corner and marker.id in self.corner_mapping:
-                corner_name = self.corner_mapping[marker.id]
-                self.corner_markers[corner_name] = marker.center
+        corner_mask = markers.types == TYPE_CORNER
+        for marker_id, center in zip(markers.ids[corner_mask].tolist(),
+                                     markers.centers[corner_mask].tolist()):
+            corner_name = self.corner_mapping[marker_id]
+            self.corner_markers[corner_name] = tuple(center)
         
         # Check if we have all four corners
         required_corners = ['CORNER_TL', 'CORNER_TR', 'CORNER_BL', 'CORNER_BR']
@@ -224,29 +442,47 @@ class ArucoPreviewApp:
         else:
             self.surface_corners = None
     
-    def draw_corner_overlays(self, frame: np.ndarray, detected_markers: List[DetectedMarker]) -> np.ndarray:
-        """Draw overlays for corner ArUco markers."""
-        overlay_frame = frame.copy()
-        
-        for marker in detected_markers:
-            if marker.is_corner and self.detect_corners:
-                # Draw marker outline
-                corners_array = np.array(marker.corners, dtype=int)
-                cv2.polylines(overlay_frame, [corners_array], True, self.colors['corner_marker'], 2)
+    def render_overlays(self, frame: np.ndarray, markers: MarkerBatch) -> np.ndarray:
+        """Convert a camera frame for display and draw all overlays on it."""
+        # Classify once: row t is the mask of markers with type code t
+        type_masks = np.arange(4)[:, None] == markers.types
+        
+        display_frame = self.frame_to_display(frame)
+        self.draw_corner_overlays(display_frame, markers, type_masks)
+        self.draw_player_overlays(display_frame, markers, type_masks)
+        self.draw_info_overlay(display_frame, markers, type_masks)
+        self.draw_help_overlay(display_frame)
+        return display_frame
+    
+    def draw_corner_overlays(self, frame: np.ndarray, markers: MarkerBatch,
+                             type_masks: Optional[np.ndarray] = None) -> np.ndarray:
+        """Draw overlays for corner ArUco markers (in place)."""
+        overlay_frame = frame
+        
+        corner_mask = (type_masks[TYPE_CORNER] if type_masks is not None
+                       else markers.types == TYPE_CORNER)
+        if self.detect_corners and corner_mask.any():
+            # Draw all marker outlines in one call
+            cv2.polylines(overlay_frame, list(markers.corners[corner_mask]), True,
+                          self.colors['corner_marker'], 2)
+            
+            for marker_id, center in zip(markers.ids[corner_mask].tolist(),
+                                         markers.centers[corner_mask].tolist()):
+                center = tuple(center)
                 
                 # Draw center point
-                cv2.circle(overlay_frame, marker.center, 8, self.colors['corner_marker'], -1)
+                cv2.circle(overlay_frame, center, 8, self.colors['corner_marker'], -1)
                 
                 # Draw corner label
-                corner_name = self.corner_mapping.get(marker.id, f"ID_{marker.id}")
+                corner_name = self.corner_mapping.get(marker_id, f"ID_{marker_id}")
                 label = corner_name.replace('CORNER_', '')
                 cv2.putText(overlay_frame, label, 
-                           (marker.center[0] + 15, marker.center[1] - 15),
+                           (center[0] + 15, center[1] - 15),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, self.colors['corner_marker'], 2)
                 
                 # Draw marker ID
-                cv2.putText(overlay_frame, str(marker.id), 
-                           (marker.center[0] - 10, marker.center[1] + 5),
+                cv2.putText(overlay_frame, str(marker_id), 
+                           (center[0] - 10, center[1] + 5),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.colors['corner_marker'], 2)
         
         # Draw surface bounding box if all corners detected
@@ -264,75 +500,89 @@ class ArucoPreviewApp:
         
         return overlay_frame
     
-    def draw_player_overlays(self, frame: np.ndarray, detected_markers: List[DetectedMarker]) -> np.ndarray:
-        """Draw overlays for player token ArUco markers."""
-        overlay_frame = frame.copy()
-        
-        for marker in detected_markers:
-            if (marker.marker_type == 'player' or marker.marker_type == 'item') and self.detect_players:
+    def draw_player_overlays(self, frame: np.ndarray, markers: MarkerBatch,
+                             type_masks: Optional[np.ndarray] = None) -> np.ndarray:
+        """Draw overlays for player token ArUco markers (in place)."""
+        overlay_frame = frame
+        if not self.detect_players:
+            return overlay_frame
+        if type_masks is None:
+            type_masks = np.arange(4)[:, None] == markers.types
+        
+        item_color = (255, 165, 0)  # Orange for items
+        token_mask = ~type_masks[TYPE_CORNER]
+        ids = markers.ids[token_mask].tolist()
+        centers = markers.centers[token_mask].tolist()
+        confidences = markers.confidences[token_mask].tolist()
+        types = markers.types[token_mask].tolist()
+        
+        # Shapes first, then outlines on top of them, then labels
+        for center, confidence, marker_type in zip(centers, confidences, types):
+            if marker_type == TYPE_PLAYER or marker_type == TYPE_ITEM:
+                center = tuple(center)
                 # Different colors for different marker types
-                if marker.marker_type == 'player':
+                if marker_type == TYPE_PLAYER:
                     color = self.colors['player_circle']  # Red for players
                     shape_style = 'circle'
                 else:  # item markers
-                    color = (255, 165, 0)  # Orange for items
+                    color = item_color
                     shape_style = 'square'
                 
                 # Draw different shapes based on confidence and type
-                if marker.confidence > 0.8:
+                if confidence > 0.8:
                     # High confidence
                     if shape_style == 'circle':
-                        cv2.circle(overlay_frame, marker.center, 20, color, -1)
-                        cv2.circle(overlay_frame, marker.center, 22, self.colors['player_text'], 2)
+                        cv2.circle(overlay_frame, center, 20, color, -1)
+                        cv2.circle(overlay_frame, center, 22, self.colors['player_text'], 2)
                     else:  # square for items
                         cv2.rectangle(overlay_frame,
-                                     (marker.center[0] - 20, marker.center[1] - 20),
-                                     (marker.center[0] + 20, marker.center[1] + 20),
+                                     (center[0] - 20, center[1] - 20),
+                                     (center[0] + 20, center[1] + 20),
                                      color, -1)
                         cv2.rectangle(overlay_frame,
-                                     (marker.center[0] - 22, marker.center[1] - 22),
-                                     (marker.center[0] + 22, marker.center[1] + 22),
+                                     (center[0] - 22, center[1] - 22),
+                                     (center[0] + 22, center[1] + 22),
                                      self.colors['player_text'], 2)
-                elif marker.confidence > 0.5:
+                elif confidence > 0.5:
                     # Medium confidence: outline only
                     if shape_style == 'circle':
-                        cv2.circle(overlay_frame, marker.center, 20, color, 3)
+                        cv2.circle(overlay_frame, center, 20, color, 3)
                     else:  # square outline
                         cv2.rectangle(overlay_frame,
-                                     (marker.center[0] - 20, marker.center[1] - 20),
-                                     (marker.center[0] + 20, marker.center[1] + 20),
+                                     (center[0] - 20, center[1] - 20),
+                                     (center[0] + 20, center[1] + 20),
                                      color, 3)
                 else:
                     # Low confidence: dashed
                     if shape_style == 'circle':
-                        self.draw_dashed_circle(overlay_frame, marker.center, 20, color, 2)
+                        self.draw_dashed_circle(overlay_frame, center, 20, color, 2)
                     else:
-                        self.draw_dashed_square(overlay_frame, marker.center, 20, color, 2)
-                
-                # Draw marker outline
-                corners_array = np.array(marker.corners, dtype=int)
-                cv2.polylines(overlay_frame, [corners_array], True, color, 1)
-                
+                        self.draw_dashed_square(overlay_frame, center, 20, color, 2)
+        
+        # Draw marker outlines with one call per type
+        for marker_type, color in ((TYPE_PLAYER, self.colors['player_circle']), (TYPE_ITEM, item_color)):
+            type_mask = type_masks[marker_type]
+            if type_mask.any():
+                cv2.polylines(overlay_frame, list(markers.corners[type_mask]), True, color, 1)
+        
+        for marker_id, center, confidence, marker_type in zip(ids, centers, confidences, types):
+            center = tuple(center)
+            if marker_type == TYPE_PLAYER or marker_type == TYPE_ITEM:
                 # Generate appropriate label
-                if marker.marker_type == 'player':
-                    player_num = marker.id - self.player_id_range[0] + 1
+                if marker_type == TYPE_PLAYER:
+                    player_num = marker_id - self.player_id_range[0] + 1
                     label = f"P{player_num}"
-                elif marker.marker_type == 'item':
+                elif marker_type == TYPE_ITEM:
                     # Use a short item name based on ID
-                    item_names = {
-                        30: "Gob", 31: "Orc", 32: "Ske", 33: "Drg", 34: "Trl", 35: "Wiz", 36: "Bst", 37: "Dem",
-                        40: "Chr", 41: "Mag", 42: "Gld", 43: "Pot", 44: "Wpn", 45: "Arm", 46: "Scr", 47: "Key",
-                        50: "Mer", 51: "Grd", 52: "Nob", 53: "Inn", 54: "Pri", 55: "Dor", 56: "Trp", 57: "Fir",
-                        58: "Alt", 59: "Por", 60: "Veh", 61: "Obj"
-                    }
-                    label = item_names.get(marker.id, f"I{marker.id}")
+                    name = self._ITEM_NAMES[marker_id - 30] if 30 <= marker_id <= 61 else None
+                    label = name or f"I{marker_id}"
                 else:
-                    label = f"C{marker.id}"
+                    label = f"C{marker_id}"
                 
                 # Calculate text size for centering
-                text_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
-                text_x = marker.center[0] - text_size[0] // 2
-                text_y = marker.center[1] + text_size[1] // 2
+                text_size = _label_text_size(label)
+                text_x = center[0] - text_size[0] // 2
+                text_y = center[1] + text_size[1] // 2
                 
                 # Draw text with background
                 cv2.rectangle(overlay_frame, 
@@ -343,35 +593,80 @@ class ArucoPreviewApp:
                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.colors['player_text'], 2)
                 
                 # Show marker ID and confidence
-                info_text = f"ID:{marker.id} {marker.confidence:.2f}"
+                info_text = f"ID:{marker_id} {confidence:.2f}"
                 cv2.putText(overlay_frame, info_text,
-                           (marker.center[0] + 25, marker.center[1] + 25),
+                           (center[0] + 25, center[1] + 25),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.4, self.colors['player_text'], 1)
             
             # Handle custom markers (62+)
-            elif marker.marker_type == 'custom' and self.detect_players:
+            elif marker_type == TYPE_CUSTOM:
                 # Draw custom markers with different style
-                cv2.circle(overlay_frame, marker.center, 15, (255, 0, 255), 2)  # Magenta circle
+                cv2.circle(overlay_frame, center, 15, (255, 0, 255), 2)  # Magenta circle
                 
-                label = f"C{marker.id}"
+                label = f"C{marker_id}"
                 cv2.putText(overlay_frame, label,
-                           (marker.center[0] + 20, marker.center[1]),
+                           (center[0] + 20, center[1]),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 255), 1)
         
         return overlay_frame
     
     def draw_dashed_circle(self, frame: np.ndarray, center: Tuple[int, int], 
                           radius: int, color: Tuple[int, int, int], thickness: int):
-        """Draw a dashed circle."""
+        """Draw a dashed circle from a cached stamp."""
+        stamp = self._dashed_stamp('circle', radius, thickness)
+        self._blit_stamp(frame, center, stamp, color)
+    
+    def draw_dashed_square(self, frame: np.ndarray, center: Tuple[int, int], 
+                          size: int, color: Tuple[int, int, int], thickness: int):
+        """Draw a dashed square from a cached stamp."""
+        stamp = self._dashed_stamp('square', size, thickness)
+        self._blit_stamp(frame, center, stamp, color)
+    
+    def _dashed_stamp(self, shape: str, size: int, thickness: int) -> np.ndarray:
+        """Get (rendering once) a boolean mask of a dashed shape centered in the stamp."""
+        key = (shape, size, thickness)
+        stamp = self._dashed_stamps.get(key)
+        if stamp is None:
+            half = size + thickness + 2
+            canvas = np.zeros((2 * half + 1, 2 * half + 1), dtype=np.uint8)
+            if shape == 'circle':
+                self._render_dashed_circle(canvas, (half, half), size, 255, thickness)
+            else:
+                self._render_dashed_square(canvas, (half, half), size, 255, thickness)
+            stamp = canvas.astype(bool)
+            self._dashed_stamps[key] = stamp
+        return stamp
+    
+    @staticmethod
+    def _blit_stamp(frame: np.ndarray, center: Tuple[int, int], stamp: np.ndarray,
+                    color: Tuple[int, int, int]):
+        """Paint the stamp's set pixels in color, clipped to the frame."""
+        half = stamp.shape[0] // 2
+        x0, y0 = center[0] - half, center[1] - half
+        fx0, fy0 = max(x0, 0), max(y0, 0)
+        fx1 = min(x0 + stamp.shape[1], frame.shape[1])
+        fy1 = min(y0 + stamp.shape[0], frame.shape[0])
+        if fx0 >= fx1 or fy0 >= fy1:
+            return
+        
+        mask = stamp[fy0 - y0:fy1 - y0, fx0 - x0:fx1 - x0]
+        roi = frame[fy0:fy1, fx0:fx1]
+        np.copyto(roi, np.array(color, dtype=frame.dtype), where=mask[..., None])
+    
+    @staticmethod
+    def _render_dashed_circle(frame: np.ndarray, center: Tuple[int, int], 
+                              radius: int, color, thickness: int):
+        """Render a dashed circle."""
         # Draw circle as series of small arcs
         for i in range(0, 360, 20):
             start_angle = i
             end_angle = i + 10
             cv2.ellipse(frame, center, (radius, radius), 0, start_angle, end_angle, color, thickness)
     
-    def draw_dashed_square(self, frame: np.ndarray, center: Tuple[int, int], 
-                          size: int, color: Tuple[int, int, int], thickness: int):
-        """Draw a dashed square."""
+    @staticmethod
+    def _render_dashed_square(frame: np.ndarray, center: Tuple[int, int], 
+                              size: int, color, thickness: int):
+        """Render a dashed square."""
         # Draw square as series of small line segments
         half_size = size
         corners = [
@@ -401,101 +696,132 @@ class ArucoPreviewApp:
                     
                     cv2.line(frame, (seg_start_x, seg_start_y), (seg_end_x, seg_end_y), color, thickness)
     
-    def draw_info_overlay(self, frame: np.ndarray, detected_markers: List[DetectedMarker]) -> np.ndarray:
-        """Draw information overlay with statistics."""
-        overlay_frame = frame.copy()
+    @staticmethod
+    def _paste_sprite(frame: np.ndarray, x: int, y: int, sprite: np.ndarray):
+        """Copy an opaque pre-rendered panel onto the frame at (x, y), clipped to the frame."""
+        fx0, fy0 = max(x, 0), max(y, 0)
+        fx1 = min(x + sprite.shape[1], frame.shape[1])
+        fy1 = min(y + sprite.shape[0], frame.shape[0])
+        if fx0 < fx1 and fy0 < fy1:
+            frame[fy0:fy1, fx0:fx1] = sprite[fy0 - y:fy1 - y, fx0 - x:fx1 - x]
+    
+    def draw_info_overlay(self, frame: np.ndarray, markers: MarkerBatch,
+                          type_masks: Optional[np.ndarray] = None) -> np.ndarray:
+        """Draw information overlay with statistics (in place)."""
+        overlay_frame = frame
         
         # Count detections by type
-        corner_count = sum(1 for m in detected_markers if m.is_corner)
-        player_count = sum(1 for m in detected_markers if m.marker_type == 'player')
-        item_count = sum(1 for m in detected_markers if m.marker_type == 'item')
-        custom_count = sum(1 for m in detected_markers if m.marker_type == 'custom')
-        
-        # Prepare info text
-        info_lines = [
-            f"ArUco Detection (6x6_250) - Optimized",
-            f"FPS: {self.fps:.1f}",
-            f"Resolution: {self.resolution[0]}x{self.resolution[1]}",
+        if type_masks is not None:
+            counts = np.count_nonzero(type_masks, axis=1)
+        else:
+            counts = np.bincount(markers.types, minlength=4)[:4]
+        corner_count, player_count, item_count, custom_count = counts.tolist()
+        
+        # Clock text only changes once per second
+        now = int(time.time())
+        if now != self._info_time_sec:
+            self._info_time_sec = now
+            self._info_time_line = f"Time: {datetime.fromtimestamp(now).strftime('%H:%M:%S')}"
+        
+        # Prepare info text. The panel and the FPS/resolution lines never change and
+        # are pre-rendered; the title overflows the panel so it is drawn each frame.
+        info_lines = (
             f"Corners: {corner_count}/4",
             f"Players: {player_count}/16",
             f"Items: {item_count}/32",
             f"Custom: {custom_count}",
-            f"Surface: {'CALIBRATED' if self.surface_corners else 'NOT CALIBRATED'}",
-            f"Time: {datetime.now().strftime('%H:%M:%S')}"
-        ]
-        
-        # Draw info panel background
-        panel_height = len(info_lines) * 25 + 20
-        cv2.rectangle(overlay_frame, (10, 10), (280, panel_height), (0, 0, 0), -1)
-        cv2.rectangle(overlay_frame, (10, 10), (280, panel_height), self.colors['info_text'], 1)
-        
-        # Draw info text
-        for i, line in enumerate(info_lines):
+            "Surface: CALIBRATED" if self.surface_corners else "Surface: NOT CALIBRATED",
+            self._info_time_line
+        )
+        static_count = 2
+        panel_height = (1 + static_count + len(info_lines)) * 25 + 20
+        
+        if self._info_sprite is None:
+            static_lines = [
+                f"FPS: {self.fps:.1f}",
+                f"Resolution: {self.resolution[0]}x{self.resolution[1]}"
+            ]
+            # Info panel background, in sprite coordinates (panel origin at (10, 10))
+            sprite = np.zeros((panel_height - 9, 271, 3), dtype=np.uint8)
+            cv2.rectangle(sprite, (0, 0), (270, panel_height - 10), self.colors['info_text'], 1)
+            for i, line in enumerate(static_lines, start=1):
+                cv2.putText(sprite, line, (10, 20 + i * 25),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.colors['info_text'], 1)
+            self._info_sprite = sprite
+        self._paste_sprite(overlay_frame, 10, 10, self._info_sprite)
+        
+        # Draw the title and the changing lines
+        cv2.putText(overlay_frame, "ArUco Detection (6x6_250) - Optimized", (20, 30),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.colors['corner_marker'], 1)
+        for i, line in enumerate(info_lines, start=1 + static_count):
             y_pos = 30 + i * 25
-            color = self.colors['corner_marker'] if i == 0 else self.colors['info_text']
             cv2.putText(overlay_frame, line, (20, y_pos),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 1)
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.colors['info_text'], 1)
         
         return overlay_frame
     
     def draw_help_overlay(self, frame: np.ndarray) -> np.ndarray:
-        """Draw help overlay with keyboard controls."""
+        """Draw help overlay with keyboard controls (in place)."""
         if not self.show_help:
             return frame
         
-        overlay_frame = frame.copy()
-        
-        help_lines = [
-            "ARUCO CONTROLS:",
-            "q/ESC - Quit",
-            "c - Toggle corner detection",
-            "p - Toggle player/item detection", 
-            "s - Save current frame",
-            "f - Toggle fullscreen",
-            "h - Toggle this help",
-            "",
-            "OPTIMIZED MARKER SCHEMA:",
-            "Corner: IDs 0-3",
-            "Player: IDs 10-25 (16 max)",
-            "Items: IDs 30-61 (32 types)",
-            "Custom: IDs 62+",
-            "",
-            "VISUAL MARKERS:",
-            "Players: Red circles",
-            "Items: Orange squares", 
-            "Custom: Magenta circles",
-            "",
-            "STATUS:",
-            f"Corners: {'ON' if self.detect_corners else 'OFF'}",
-            f"Players/Items: {'ON' if self.detect_players else 'OFF'}",
-            f"Fullscreen: {'ON' if self.fullscreen else 'OFF'}"
-        ]
+        overlay_frame = frame
         
         # Calculate help panel size
         panel_width = 320
-        panel_height = len(help_lines) * 25 + 20
         start_x = frame.shape[1] - panel_width - 10
         start_y = 10
         
-        # Draw help panel background
-        cv2.rectangle(overlay_frame, (start_x, start_y), 
-                     (start_x + panel_width, start_y + panel_height), 
-                     self.colors['help_bg'], -1)
-        cv2.rectangle(overlay_frame, (start_x, start_y), 
-                     (start_x + panel_width, start_y + panel_height), 
-                     self.colors['info_text'], 1)
-        
-        # Draw help text
-        for i, line in enumerate(help_lines):
-            y_pos = start_y + 20 + i * 25
-            if line.startswith("ARUCO") or line.startswith("MARKER") or line.startswith("STATUS"):
-                color = self.colors['corner_marker']
-            else:
-                color = self.colors['info_text']
+        # The panel only changes when a toggle does, so it is rendered once per state
+        help_key = (self.detect_corners, self.detect_players, self.fullscreen, start_x)
+        if self._help_sprite_key != help_key:
+            help_lines = [
+                "ARUCO CONTROLS:",
+                "q/ESC - Quit",
+                "c - Toggle corner detection",
+                "p - Toggle player/item detection", 
+                "s - Save current frame",
+                "f - Toggle fullscreen",
+                "h - Toggle this help",
+                "",
+                "OPTIMIZED MARKER SCHEMA:",
+                "Corner: IDs 0-3",
+                "Player: IDs 10-25 (16 max)",
+                "Items: IDs 30-61 (32 types)",
+                "Custom: IDs 62+",
+                "",
+                "VISUAL MARKERS:",
+                "Players: Red circles",
+                "Items: Orange squares", 
+                "Custom: Magenta circles",
+                "",
+                "STATUS:",
+                f"Corners: {'ON' if self.detect_corners else 'OFF'}",
+                f"Players/Items: {'ON' if self.detect_players else 'OFF'}",
+                f"Fullscreen: {'ON' if self.fullscreen else 'OFF'}"
+            ]
+            panel_height = len(help_lines) * 25 + 20
+            
+            # Help panel background, in sprite coordinates
+            sprite = np.zeros((panel_height + 1, panel_width + 1, 3), dtype=np.uint8)
+            cv2.rectangle(sprite, (0, 0), (panel_width, panel_height), self.colors['help_bg'], -1)
+            cv2.rectangle(sprite, (0, 0), (panel_width, panel_height), self.colors['info_text'], 1)
             
-            cv2.putText(overlay_frame, line, (start_x + 10, y_pos),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+            # Help text
+            for i, line in enumerate(help_lines):
+                y_pos = 20 + i * 25
+                if line.startswith("ARUCO") or line.startswith("MARKER") or line.startswith("STATUS"):
+                    color = self.colors['corner_marker']
+                else:
+                    color = self.colors['info_text']
+                
+                cv2.putText(sprite, line, (10, y_pos),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+            
+            self._help_sprite = sprite
+            self._help_sprite_key = help_key
         
+        self._paste_sprite(overlay_frame, start_x, start_y, self._help_sprite)
         return overlay_frame
     
     def save_frame(self, frame: np.ndarray):
@@ -507,7 +833,7 @@ class ArucoPreviewApp:
         os.makedirs("saved_frames", exist_ok=True)
         filepath = os.path.join("saved_frames", filename)
         
-        cv2.imwrite(filepath, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+        cv2.imwrite(filepath, frame)
         print(f"Frame saved: {filepath}")
         self.save_counter += 1
     
@@ -549,42 +875,60 @@ class ArucoPreviewApp:
         self.running = True
         print("Starting ArUco Camera Preview...")
         print("Marker schema: Corners=0-3, Players=10-99, Custom=100+")
-        print("Press 'h' to toggle help, 'q' to quit")
-        
-        # Create window
-        cv2.namedWindow("ArUco Camera Preview", cv2.WINDOW_NORMAL)
+        if self.display_enabled:
+            print("Press 'h' to toggle help, 'q' to quit")
+            
+            # Create window
+            cv2.namedWindow("ArUco Camera Preview", cv2.WINDOW_NORMAL)
+        else:
+            print("Running headless, press Ctrl+C to quit")
+        window_shown = False
         
         # Calculate frame time for target FPS
         frame_time = 1.0 / self.fps
-        last_frame_time = time.time()
+        last_frame_time = time.monotonic() - frame_time
         
         try:
             while self.running:
-                current_time = time.time()
+                # Control frame rate: sleep once until the next frame is due
+                delay = last_frame_time + frame_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                current_time = time.monotonic()
                 
-                # Control frame rate
-                if current_time - last_frame_time < frame_time:
-                    time.sleep(0.01)  # Small sleep to prevent busy waiting
+                # Take the newest captured frame, waking as soon as one arrives
+                if not self._frame_event.wait(timeout=frame_time):
+                    if not self._capturing:
+                        print("Camera capture stopped; exiting preview")
+                        break
                     continue
-                
-                # Capture frame
-                frame = self.picam.capture_array()
+                with self._frame_lock:
+                    frame = self._latest_frame
+                    self._frame_in_use = frame
+                    self._frame_event.clear()
+                last_frame_time = current_time
                 
                 # Detect ArUco markers
-                detected_markers = self.detect_aruco_markers(frame)
+                markers = self.detect_aruco_markers(frame)
                 
                 # Update surface calibration
-                self.update_surface_calibration(detected_markers)
+                self.update_surface_calibration(markers)
                 
-                # Apply overlays
-                display_frame = frame.copy()
-                display_frame = self.draw_corner_overlays(display_frame, detected_markers)
-                display_frame = self.draw_player_overlays(display_frame, detected_markers)
-                display_frame = self.draw_info_overlay(display_frame, detected_markers)
-                display_frame = self.draw_help_overlay(display_frame)
+                # Skip all drawing when headless or once the window has been closed
+                if not self.display_enabled:
+                    continue
+                if window_shown and cv2.getWindowProperty("ArUco Camera Preview",
+                                                          cv2.WND_PROP_VISIBLE) < 1:
+                    print("Preview window closed; continuing headless (Ctrl+C to quit)")
+                    self.display_enabled = False
+                    continue
+                
+                # Apply overlays on a BGR copy; the capture buffer stays untouched
+                display_frame = self.render_overlays(frame, markers)
                 
                 # Display frame
                 cv2.imshow("ArUco Camera Preview", display_frame)
+                window_shown = True
                 
                 # Handle keyboard input
                 key_result = self.handle_keyboard()
@@ -593,8 +937,6 @@ class ArucoPreviewApp:
                 elif key_result == 'save':
                     self.save_frame(display_frame)
                 
-                last_frame_time = current_time
-                
         except KeyboardInterrupt:
             print("\nStopping preview...")
         finally:
@@ -603,6 +945,10 @@ class ArucoPreviewApp:
     def stop(self):
         """Stop the preview application."""
         self.running = False
+        self._capturing = False
+        if self._capture_thread is not None:
+            self._capture_thread.join(timeout=2.0)
+            self._capture_thread = None
         if self.picam:
             self.picam.stop()
         cv2.destroyAllWindows()
@@ -618,6 +964,18 @@ def main():
     parser.add_argument("--no-players", action="store_true", help="Start with player detection disabled")
     parser.add_argument("--no-help", action="store_true", help="Start with help overlay hidden")
     parser.add_argument("--fullscreen", action="store_true", help="Start in fullscreen mode")
+    parser.add_argument("--no-display", action="store_true",
+                        help="Run detection and calibration without a preview window")
+    parser.add_argument("--detect-scale", type=int, default=1,
+                        help="Downscale factor for marker detection (1 = full resolution; "
+                             "2 is faster but misses markers smaller than ~32px)")
+    parser.add_argument("--full-scan-interval", type=int, default=10,
+                        help="Frames between full-frame marker scans (1 = scan every frame). "
+                             "A full scan still runs at least once per second: new markers "
+                             "only appear on full scans, so larger intervals trade placement "
+                             "latency for speed")
+    parser.add_argument("--opencl", action="store_true",
+                        help="Use OpenCL (GPU) for detection if OpenCV supports it")
     
     args = parser.parse_args()
     
@@ -641,6 +999,17 @@ def main():
         app.show_help = False
     if args.fullscreen:
         app.fullscreen = True
+    if args.no_display:
+        app.display_enabled = False
+    app.detect_scale = max(1, args.detect_scale)
+    app.full_scan_interval = max(1, args.full_scan_interval)
+    if args.opencl:
+        if cv2.ocl.haveOpenCL():
+            cv2.ocl.setUseOpenCL(True)
+            app.use_opencl = True
+            print(f"OpenCL enabled ({cv2.ocl.Device.getDefault().name()})")
+        else:
+            print("OpenCL not available in this OpenCV build; using CPU detection")
     
     # Initialize camera
     if not app.initialize_camera():
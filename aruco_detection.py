@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Shared ArUco Detector Settings
+==============================
+
+Detector parameters used by both the tracker (aruco_tracker.py) and the
+camera preview (aruco_camera.py), so the two always detect the same markers.
+"""
+
+import cv2
+
+
+# Detector parameters tuned for the Pi's CPU budget: two adaptive threshold
+# passes and no corner refinement (positions and overlays only need whole pixels)
+FAST_DETECTOR_PARAMS = {
+    "adaptiveThreshWinSizeMin": 5,
+    "adaptiveThreshWinSizeMax": 15,
+    "adaptiveThreshWinSizeStep": 10,
+    # Relative to the larger image side: 0.03 * 1280px = 38px perimeter, i.e.
+    # ~10px sides, well under the ~19px a 15mm print spans at about 1m. The
+    # rate scales with the image, so the bound holds at any detect_scale.
+    "minMarkerPerimeterRate": 0.03,
+    "maxMarkerPerimeterRate": 2.0,
+    "cornerRefinementMethod": cv2.aruco.CORNER_REFINE_NONE,
+    "polygonalApproxAccuracyRate": 0.08,
+}
+
+
+def tuned_parameters(parameters, **overrides):
+    """Apply FAST_DETECTOR_PARAMS (plus overrides) to ArUco detector parameters."""
+    for name, value in {**FAST_DETECTOR_PARAMS, **overrides}.items():
+        setattr(parameters, name, value)
+    return parameters
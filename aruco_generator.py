@@ -19,16 +19,31 @@ import cv2
 import numpy as np
 import argparse
 import os
+import sys
 from pathlib import Path
 import json
-from PIL import Image, ImageDraw, ImageFont
-from typing import List, Dict, Tuple
+import string
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional
+
+try:
+    from PIL import Image
+except ImportError:
+    # Optional: only needed for --pdf output
+    Image = None
+
+try:
+    import orjson
+except ImportError:
+    # Optional: faster JSON encoding for the marker database
+    orjson = None
 
 
 class ArucoMarkerGenerator:
     """Generate ArUco markers with labels and documentation."""
     
-    def __init__(self, dictionary=cv2.aruco.DICT_6X6_250, marker_size=200, border_bits=1):
+    def __init__(self, dictionary=cv2.aruco.DICT_6X6_250, marker_size=200, border_bits=1,
+                 png_compression=1, verbose=True):
         """
         Initialize the ArUco marker generator.
         
@@ -36,12 +51,29 @@ class ArucoMarkerGenerator:
             dictionary: ArUco dictionary to use
             marker_size: Size of marker in pixels
             border_bits: White border size around marker
+            png_compression: zlib level (0-9) for PNG output; low levels encode much faster
+            verbose: Print which OpenCV generation API is in use
         """
+        self.dictionary_id = dictionary
         self.dictionary = cv2.aruco.getPredefinedDictionary(dictionary)
         self.marker_size = marker_size
         self.border_bits = border_bits
+        self.png_params = [int(cv2.IMWRITE_PNG_COMPRESSION), png_compression]
+        
+        # Scratch canvas (marker plus 100px label area) reused between markers
+        self._label_scratch = np.empty((marker_size + 100, marker_size), dtype=np.uint8)
         self.generated_markers = []
         
+        # Labeled marker images kept in memory by ID so print sheets can be
+        # composed without re-reading and decoding the PNGs from disk
+        self._image_cache: Dict[int, np.ndarray] = {}
+        
+        # Label text is drawn with OpenCV's Hershey fonts directly on the numpy canvas
+        self._label_font = cv2.FONT_HERSHEY_SIMPLEX
+        
+        # Pre-rasterized glyphs for the ID/name lines, composed by slicing
+        self._glyph_atlas = self._build_glyph_atlas(0.7, 2)
+        
         # Check OpenCV version for API compatibility
         self.opencv_version = cv2.__version__
         opencv_major = int(self.opencv_version.split('.')[0])
@@ -50,10 +82,12 @@ class ArucoMarkerGenerator:
         # Determine which marker generation API to use
         if opencv_major > 4 or (opencv_major == 4 and opencv_minor >= 7):
             self.use_new_api = True
-            print(f"Using new ArUco marker generation API (OpenCV {self.opencv_version})")
+            if verbose:
+                print(f"Using new ArUco marker generation API (OpenCV {self.opencv_version})")
         else:
             self.use_new_api = False
-            print(f"Using legacy ArUco marker generation API (OpenCV {self.opencv_version})")
+            if verbose:
+                print(f"Using legacy ArUco marker generation API (OpenCV {self.opencv_version})")
         
         # Marker ID assignments - optimized for smaller markers
         self.corner_ids = {
@@ -101,73 +135,147 @@ class ArucoMarkerGenerator:
             {"id": 61, "name": "Objective", "description": "Quest goal - Mission objective marker"}
         ]
     
-    def generate_marker(self, marker_id: int) -> np.ndarray:
-        """Generate a single ArUco marker with OpenCV version compatibility."""
+    def _draw_marker_into(self, buffer: np.ndarray, marker_id: int):
+        """
+        Draw a marker into an existing contiguous (marker_size x marker_size)
+        uint8 buffer, so OpenCV writes in place instead of allocating.
+        """
         if self.use_new_api:
             # New API (OpenCV 4.7+)
             try:
                 marker_image = cv2.aruco.generateImageMarker(
-                    self.dictionary, marker_id, self.marker_size, borderBits=self.border_bits)
+                    self.dictionary, marker_id, self.marker_size, buffer, self.border_bits)
+                if marker_image is not buffer:
+                    # OpenCV allocated a new image rather than writing in place
+                    buffer[:] = marker_image
+                return
             except AttributeError:
                 # Fallback to legacy API if new function not available
                 print(f"Warning: generateImageMarker not available, using legacy API for marker {marker_id}")
-                marker_image = np.ones((self.marker_size, self.marker_size), dtype=np.uint8) * 255
-                cv2.aruco.drawMarker(self.dictionary, marker_id, self.marker_size, 
-                                   marker_image, borderBits=self.border_bits)
-        else:
-            # Legacy API (OpenCV < 4.7)
-            # Create a white background image
-            marker_image = np.ones((self.marker_size, self.marker_size), dtype=np.uint8) * 255
-            # Draw the marker onto the image
-            cv2.aruco.drawMarker(self.dictionary, marker_id, self.marker_size, 
-                               marker_image, borderBits=self.border_bits)
-            
-        return marker_image
+        
+        # Legacy API (OpenCV < 4.7)
+        # Start from a white background
+        buffer.fill(255)
+        # Draw the marker onto the image
+        cv2.aruco.drawMarker(self.dictionary, marker_id, self.marker_size, 
+                           buffer, borderBits=self.border_bits)
     
-    def create_labeled_marker(self, marker_id: int, label: str, 
-                             description: str = "") -> np.ndarray:
-        """Create a marker with label and description for printing."""
-        marker = self.generate_marker(marker_id)
+    def _build_glyph_atlas(self, font_scale: float, thickness: int) -> Dict[str, Tuple[np.ndarray, int, int, int]]:
+        """
+        Render each label character once into a white grayscale tile.
         
-        # Convert to RGB for PIL
-        marker_rgb = cv2.cvtColor(marker, cv2.COLOR_GRAY2RGB)
+        Returns:
+            Mapping of character -> (tile, advance, ascent, pad), where the
+            tile is drawn with its baseline at row `ascent` and `pad` pixels
+            of slack on the left for anti-aliased stroke overhang.
+        """
+        atlas = {}
+        pad = thickness
+        for char in string.digits + string.ascii_letters + "_: #-":
+            (width, height), baseline = cv2.getTextSize(char, self._label_font, font_scale, thickness)
+            tile = np.full((height + baseline + 2 * pad, width + 2 * pad), 255, dtype=np.uint8)
+            cv2.putText(tile, char, (pad, height + pad), self._label_font,
+                       font_scale, 0, thickness, cv2.LINE_AA)
+            # getTextSize includes the stroke thickness in the width
+            atlas[char] = (tile, width - thickness, height + pad, pad)
+        return atlas
+    
+    def _blit_text(self, image: np.ndarray, x: int, y: int, text: str) -> bool:
+        """
+        Draw black text with its baseline at (x, y) from the glyph atlas.
         
-        # Create a larger image with space for labels
-        label_height = 100
-        total_height = self.marker_size + label_height
-        labeled_image = np.ones((total_height, self.marker_size, 3), dtype=np.uint8) * 255
+        Returns False without drawing if any character is not in the atlas.
+        """
+        if not all(char in self._glyph_atlas for char in text):
+            return False
+        
+        img_h, img_w = image.shape[:2]
+        cursor = x
+        for char in text:
+            tile, advance, ascent, pad = self._glyph_atlas[char]
+            top, left = y - ascent, cursor - pad
+            # Clip the tile to the image bounds
+            y0, x0 = max(top, 0), max(left, 0)
+            y1, x1 = min(top + tile.shape[0], img_h), min(left + tile.shape[1], img_w)
+            if y1 > y0 and x1 > x0:
+                glyph = tile[y0 - top:y1 - top, x0 - left:x1 - left]
+                region = image[y0:y1, x0:x1]
+                # Darkest pixel wins, so overlapping glyph edges compose cleanly
+                if region.ndim == 3:
+                    glyph = glyph[:, :, np.newaxis]
+                np.minimum(region, glyph, out=region)
+            cursor += advance
+        return True
+    
+    def create_labeled_marker(self, marker_id: int, label: str, 
+                             description: str = "", out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Create a marker with label and description for printing.
         
-        # Place marker in the image
-        labeled_image[0:self.marker_size, 0:self.marker_size] = marker_rgb
+        The marker is drawn straight into the top square of a
+        (marker_size + 100, marker_size) grayscale canvas and the labels into
+        the area below, with no intermediate images. Pass `out` to render into
+        an existing canvas of that shape; otherwise a new one is allocated.
+        """
+        # Create a larger image with space for labels
+        canvas = np.empty(self._label_scratch.shape, dtype=np.uint8) if out is None else out
         
-        # Convert to PIL for text rendering
-        pil_image = Image.fromarray(labeled_image)
-        draw = ImageDraw.Draw(pil_image)
+        # Markers and labels are pure grayscale, so the canvas is single-channel.
+        # The canvas is exactly marker_size wide, so its top square is a
+        # contiguous view that OpenCV can draw into directly.
+        self._draw_marker_into(canvas[0:self.marker_size], marker_id)
+        canvas[self.marker_size:].fill(255)
         
-        try:
-            # Try to use a nice font
-            font_large = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 20)
-            font_small = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 14)
-        except:
-            # Fallback to default font
-            font_large = ImageFont.load_default()
-            font_small = ImageFont.load_default()
-        
-        # Draw label
+        # Draw label (putText positions text by its baseline)
         text_y = self.marker_size + 10
-        draw.text((10, text_y), f"ID: {marker_id}", fill=(0, 0, 0), font=font_large)
-        draw.text((10, text_y + 25), label, fill=(0, 0, 0), font=font_large)
+        for line, baseline_y in ((f"ID: {marker_id}", text_y + 18), (label, text_y + 43)):
+            if not self._blit_text(canvas, 10, baseline_y, line):
+                cv2.putText(canvas, line, (10, baseline_y),
+                           self._label_font, 0.7, 0, 2, cv2.LINE_AA)
         
         if description:
-            draw.text((10, text_y + 50), description, fill=(100, 100, 100), font=font_small)
+            cv2.putText(canvas, description, (10, text_y + 65),
+                       self._label_font, 0.45, 100, 1, cv2.LINE_AA)
         
-        # Convert back to numpy array
-        return np.array(pil_image)
+        return canvas
+    
+    def _generate_markers(self, output_dir: Path, 
+                          specs: List[Tuple[int, str, str, str, str]]) -> List[Dict]:
+        """
+        Render and save labeled markers in parallel, one process task per marker.
+        
+        Args:
+            output_dir: Directory to write marker PNGs into
+            specs: (marker_id, name, marker_type, description, filename) tuples
+        """
+        tasks = [
+            (marker_id, name, marker_type, description,
+             self.dictionary_id, self.marker_size, self.border_bits,
+             self.png_params, output_dir / filename)
+            for marker_id, name, marker_type, description, filename in specs
+        ]
+        if not tasks:
+            return []
+        
+        with ProcessPoolExecutor() as executor:
+            results = list(executor.map(_render_and_save, tasks))
+        
+        markers = []
+        created_log = []
+        for marker_info, labeled_marker in results:
+            self._image_cache[marker_info['id']] = labeled_marker
+            markers.append(marker_info)
+            created_log.append(f"  Created {marker_info['name']} (ID: {marker_info['id']}) -> {marker_info['filename']}\n")
+        
+        # Report the whole batch with a single write
+        sys.stdout.write("".join(created_log))
+        sys.stdout.flush()
+        
+        return markers
     
     def generate_corner_markers(self, output_dir: Path) -> List[Dict]:
         """Generate corner calibration markers."""
         print("Generating corner calibration markers...")
-        corner_markers = []
         
         descriptions = {
             'CORNER_TL': 'Place at top-left corner of play area',
@@ -176,33 +284,16 @@ class ArucoMarkerGenerator:
             'CORNER_BL': 'Place at bottom-left corner of play area'
         }
         
+        specs = []
         for corner_name, marker_id in self.corner_ids.items():
-            # Generate labeled marker
-            labeled_marker = self.create_labeled_marker(
-                marker_id, corner_name, descriptions[corner_name])
-            
-            # Save individual marker
             filename = f"corner_{corner_name.lower()}_id{marker_id:03d}.png"
-            filepath = output_dir / filename
-            cv2.imwrite(str(filepath), cv2.cvtColor(labeled_marker, cv2.COLOR_RGB2BGR))
-            
-            marker_info = {
-                'id': marker_id,
-                'name': corner_name,
-                'type': 'corner',
-                'description': descriptions[corner_name],
-                'filename': filename
-            }
-            corner_markers.append(marker_info)
-            
-            print(f"  Created {corner_name} (ID: {marker_id}) -> {filename}")
+            specs.append((marker_id, corner_name, 'corner', descriptions[corner_name], filename))
         
-        return corner_markers
+        return self._generate_markers(output_dir, specs)
     
     def generate_player_markers(self, output_dir: Path, count: int = 16) -> List[Dict]:
         """Generate player token markers."""
         print(f"Generating {count} player markers...")
-        player_markers = []
         
         start_id, end_id = self.player_id_range
         max_players = end_id - start_id + 1
@@ -211,62 +302,28 @@ class ArucoMarkerGenerator:
             print(f"Warning: Requested {count} players, but max is {max_players}. Generating {max_players} players.")
             count = max_players
         
+        specs = []
         for i in range(count):
             marker_id = start_id + i
             player_name = f"PLAYER_{i+1:02d}"
             description = f"Player token #{i+1}"
-            
-            # Generate labeled marker
-            labeled_marker = self.create_labeled_marker(marker_id, player_name, description)
-            
-            # Save individual marker
             filename = f"player_{i+1:02d}_id{marker_id:03d}.png"
-            filepath = output_dir / filename
-            cv2.imwrite(str(filepath), cv2.cvtColor(labeled_marker, cv2.COLOR_RGB2BGR))
-            
-            marker_info = {
-                'id': marker_id,
-                'name': player_name,
-                'type': 'player',
-                'description': description,
-                'filename': filename
-            }
-            player_markers.append(marker_info)
-            
-            print(f"  Created {player_name} (ID: {marker_id}) -> {filename}")
+            specs.append((marker_id, player_name, 'player', description, filename))
         
-        return player_markers
+        return self._generate_markers(output_dir, specs)
     
     def generate_standard_items(self, output_dir: Path) -> List[Dict]:
         """Generate standard tabletop gaming item markers."""
         print("Generating standard item markers...")
-        item_markers = []
         
+        specs = []
         for item_spec in self.standard_items:
             marker_id = item_spec['id']
             name = item_spec['name']
-            description = item_spec['description']
-            
-            # Generate labeled marker
-            labeled_marker = self.create_labeled_marker(marker_id, name, description)
-            
-            # Save individual marker
             filename = f"item_{name.lower()}_id{marker_id:03d}.png"
-            filepath = output_dir / filename
-            cv2.imwrite(str(filepath), cv2.cvtColor(labeled_marker, cv2.COLOR_RGB2BGR))
-            
-            marker_info = {
-                'id': marker_id,
-                'name': name,
-                'type': 'item',
-                'description': description,
-                'filename': filename
-            }
-            item_markers.append(marker_info)
-            
-            print(f"  Created {name} (ID: {marker_id}) -> {filename}")
+            specs.append((marker_id, name, 'item', item_spec['description'], filename))
         
-        return item_markers
+        return self._generate_markers(output_dir, specs)
     
     def generate_complete_set(self, output_dir: Path) -> Dict[str, List[Dict]]:
         """Generate complete set of markers: corners, all players, and all standard items."""
@@ -295,8 +352,8 @@ class ArucoMarkerGenerator:
     def generate_custom_markers(self, output_dir: Path, custom_specs: List[Dict]) -> List[Dict]:
         """Generate custom markers from specifications."""
         print("Generating custom markers...")
-        custom_markers = []
         
+        specs = []
         for spec in custom_specs:
             marker_id = spec['id']
             name = spec['name']
@@ -307,35 +364,14 @@ class ArucoMarkerGenerator:
                 print(f"Warning: Custom marker ID {marker_id} conflicts with standard ranges. Use IDs 62+")
                 continue
             
-            # Generate labeled marker
-            labeled_marker = self.create_labeled_marker(marker_id, name, description)
-            
-            # Save individual marker
             filename = f"custom_{name.lower().replace(' ', '_')}_id{marker_id:03d}.png"
-            filepath = output_dir / filename
-            cv2.imwrite(str(filepath), cv2.cvtColor(labeled_marker, cv2.COLOR_RGB2BGR))
-            
-            marker_info = {
-                'id': marker_id,
-                'name': name,
-                'type': 'custom',
-                'description': description,
-                'filename': filename
-            }
-            custom_markers.append(marker_info)
-            
-            print(f"  Created {name} (ID: {marker_id}) -> {filename}")
+            specs.append((marker_id, name, 'custom', description, filename))
         
-        return custom_markers
+        return self._generate_markers(output_dir, specs)
     
-    def create_print_sheet(self, markers: List[Dict], output_dir: Path, 
-                          sheet_name: str, markers_per_row: int = 4) -> str:
-        """Create a print sheet with multiple markers."""
-        print(f"Creating print sheet: {sheet_name}")
-        
-        if not markers:
-            return None
-        
+    def compose_print_sheet(self, markers: List[Dict], output_dir: Path, 
+                            sheet_name: str, markers_per_row: int = 4) -> np.ndarray:
+        """Lay out labeled markers and a title on a single grayscale sheet."""
         # Calculate sheet dimensions
         marker_width = self.marker_size
         marker_height = self.marker_size + 100  # Include label space
@@ -345,46 +381,95 @@ class ArucoMarkerGenerator:
         sheet_width = markers_per_row * marker_width + (markers_per_row + 1) * margin
         sheet_height = rows * marker_height + (rows + 1) * margin
         
-        # Create white sheet
-        sheet = np.ones((sheet_height, sheet_width, 3), dtype=np.uint8) * 255
-        
-        # Place markers on sheet
-        for i, marker_info in enumerate(markers):
-            row = i // markers_per_row
-            col = i % markers_per_row
-            
-            # Load marker image
-            marker_path = output_dir / marker_info['filename']
-            marker_img = cv2.imread(str(marker_path))
-            marker_img = cv2.cvtColor(marker_img, cv2.COLOR_BGR2RGB)
-            
-            # Calculate position
-            x = margin + col * (marker_width + margin)
-            y = margin + row * (marker_height + margin)
-            
-            # Place marker
-            sheet[y:y+marker_height, x:x+marker_width] = marker_img
+        # Use the in-memory images, falling back to disk if not generated here
+        images = []
+        for marker_info in markers:
+            marker_img = self._image_cache.get(marker_info['id'])
+            if marker_img is None:
+                marker_path = output_dir / marker_info['filename']
+                marker_img = cv2.imread(str(marker_path), cv2.IMREAD_GRAYSCALE)
+            images.append(marker_img)
+        
+        # Give every grid cell its marker plus right/bottom margin, padding the
+        # last row with blank cells, then tile all cells in one reshape
+        cell_height = marker_height + margin
+        cell_width = marker_width + margin
+        cells = np.full((rows * markers_per_row, cell_height, cell_width) + images[0].shape[2:],
+                        255, dtype=np.uint8)
+        cells[:len(images), :marker_height, :marker_width] = np.stack(images)
+        tiled = (cells.reshape((rows, markers_per_row, cell_height, cell_width) + images[0].shape[2:])
+                      .swapaxes(1, 2)
+                      .reshape((rows * cell_height, markers_per_row * cell_width) + images[0].shape[2:]))
+        
+        # Create white sheet with the top/left margin and place the grid
+        sheet = np.full((sheet_height, sheet_width) + images[0].shape[2:], 255, dtype=np.uint8)
+        sheet[margin:, margin:] = tiled
+        
+        # Add sheet title within the top margin
+        title_text = f"ArUco Markers - {sheet_name}"
+        cv2.putText(sheet, title_text, (margin, 16),
+                   self._label_font, 0.6, 0, 2, cv2.LINE_AA)
         
-        # Add sheet title
-        pil_sheet = Image.fromarray(sheet)
-        draw = ImageDraw.Draw(pil_sheet)
+        return sheet
+    
+    def create_print_sheet(self, markers: List[Dict], output_dir: Path, 
+                          sheet_name: str, markers_per_row: int = 4) -> str:
+        """Create a print sheet with multiple markers."""
+        print(f"Creating print sheet: {sheet_name}")
         
-        try:
-            title_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 24)
-        except:
-            title_font = ImageFont.load_default()
+        if not markers:
+            return None
         
-        title_text = f"ArUco Markers - {sheet_name}"
-        draw.text((margin, 10), title_text, fill=(0, 0, 0), font=title_font)
+        sheet = self.compose_print_sheet(markers, output_dir, sheet_name, markers_per_row)
         
         # Save sheet
         sheet_filename = f"print_sheet_{sheet_name.lower().replace(' ', '_')}.png"
         sheet_path = output_dir / sheet_filename
-        pil_sheet.save(str(sheet_path))
+        cv2.imwrite(str(sheet_path), sheet, self.png_params)
         
         print(f"  Created print sheet: {sheet_filename}")
         return sheet_filename
     
+    def create_print_pdf(self, sheets: List[Tuple[List[Dict], str, int]], output_dir: Path) -> str:
+        """
+        Write print sheets as pages of a single PDF, one page per category.
+        
+        Args:
+            sheets: (markers, sheet_name, markers_per_row) for each page
+            output_dir: Directory to write markers.pdf into
+        """
+        if Image is None:
+            print("Warning: Pillow is not installed, cannot write PDF (pip3 install Pillow)")
+            return None
+        
+        pages = [Image.fromarray(self.compose_print_sheet(markers, output_dir, sheet_name, per_row))
+                 for markers, sheet_name, per_row in sheets if markers]
+        if not pages:
+            return None
+        
+        pdf_filename = "markers.pdf"
+        pages[0].save(str(output_dir / pdf_filename), save_all=True, append_images=pages[1:])
+        
+        print(f"Created print PDF: {pdf_filename} ({len(pages)} pages)")
+        return pdf_filename
+    
+    def save_marker_tiff(self, markers: List[Dict], output_dir: Path) -> str:
+        """Write all generated markers into a single multi-page TIFF."""
+        if not markers:
+            return None
+        
+        if not hasattr(cv2, 'imwritemulti'):
+            print("Warning: cv2.imwritemulti not available in this OpenCV version, skipping TIFF output")
+            return None
+        
+        pages = [self._image_cache[m['id']] for m in markers if m['id'] in self._image_cache]
+        
+        tiff_filename = "all_markers.tiff"
+        cv2.imwritemulti(str(output_dir / tiff_filename), pages)
+        
+        print(f"Saved {len(pages)} markers to multi-page TIFF: {tiff_filename}")
+        return tiff_filename
+    
     def save_marker_database(self, output_dir: Path, all_markers: List[Dict]):
         """Save marker database as JSON for reference."""
         database = {
@@ -410,35 +495,57 @@ class ArucoMarkerGenerator:
         }
         
         db_path = output_dir / 'marker_database.json'
-        with open(db_path, 'w') as f:
-            json.dump(database, f, indent=2)
+        if orjson is not None:
+            with open(db_path, 'wb') as f:
+                f.write(orjson.dumps(database, option=orjson.OPT_INDENT_2))
+        else:
+            with open(db_path, 'w') as f:
+                f.write(json.dumps(database, indent=2))
         
         print(f"Saved marker database: {db_path}")
         
-        # Also save a quick reference
+        # Also save a quick reference, built up in memory and written once
+        parts = [
+            "ArUco Marker Quick Reference\n",
+            "==========================\n\n",
+            "CORNER MARKERS (Calibration):\n",
+            "ID 0: Top-Left corner\n",
+            "ID 1: Top-Right corner\n",
+            "ID 2: Bottom-Right corner\n",
+            "ID 3: Bottom-Left corner\n\n",
+            "PLAYER MARKERS (16 total):\n",
+        ]
+        parts.extend(f"ID {10+i}: Player {i+1:02d}\n" for i in range(16))
+        parts.append("\nSTANDARD ITEMS (32 total):\n")
+        parts.extend(f"ID {item['id']}: {item['name']} - {item['description']}\n"
+                     for item in self.standard_items)
+        parts.append("\nCUSTOM MARKERS:\n")
+        parts.append("IDs 62+ available for custom use\n")
+        
         ref_path = output_dir / 'quick_reference.txt'
         with open(ref_path, 'w') as f:
-            f.write("ArUco Marker Quick Reference\n")
-            f.write("==========================\n\n")
-            f.write("CORNER MARKERS (Calibration):\n")
-            f.write("ID 0: Top-Left corner\n")
-            f.write("ID 1: Top-Right corner\n")
-            f.write("ID 2: Bottom-Right corner\n")
-            f.write("ID 3: Bottom-Left corner\n\n")
-            f.write("PLAYER MARKERS (16 total):\n")
-            for i in range(16):
-                f.write(f"ID {10+i}: Player {i+1:02d}\n")
-            f.write("\nSTANDARD ITEMS (32 total):\n")
-            for item in self.standard_items:
-                f.write(f"ID {item['id']}: {item['name']} - {item['description']}\n")
-            f.write("\nCUSTOM MARKERS:\n")
-            f.write("IDs 62+ available for custom use\n")
+            f.write("".join(parts))
         
         print(f"Saved quick reference: {ref_path}")
     
     def generate_detection_reference(self, output_dir: Path):
         """Generate reference code for ArUco detection."""
-        reference_code = f'''
+        # Precompute the ID -> type code table (DICT_6X6_250 IDs fit in 0-255)
+        type_codes = []
+        for marker_id in range(256):
+            if marker_id in self.corner_ids.values():
+                type_codes.append(0)
+            elif self.player_id_range[0] <= marker_id <= self.player_id_range[1]:
+                type_codes.append(1)
+            elif self.item_id_range[0] <= marker_id <= self.item_id_range[1]:
+                type_codes.append(2)
+            else:
+                type_codes.append(3)
+        type_table = ",\n".join(
+            "    " + ", ".join(str(code) for code in type_codes[row:row + 32])
+            for row in range(0, 256, 32))
+        
+        header = f'''
 # ArUco Detection Reference Code - Optimized Schema with OpenCV Compatibility
 # ==========================================================================
 
@@ -481,6 +588,12 @@ CORNER_IDS = [0, 1, 2, 3]
 PLAYER_ID_RANGE = ({self.player_id_range[0]}, {self.player_id_range[1]})  # 16 players
 ITEM_ID_RANGE = ({self.item_id_range[0]}, {self.item_id_range[1]})      # 32 standard items
 
+# O(1) marker classification: TYPE_NAMES[TYPE_TABLE[marker_id]]
+TYPE_NAMES = ('corner', 'player', 'item', 'custom')
+TYPE_TABLE = np.array([
+{type_table}
+], dtype=np.uint8)
+
 # Detect markers in frame
 def detect_aruco_markers(frame):
     """Detect ArUco markers and return corners, ids, and rejected candidates."""
@@ -497,28 +610,20 @@ def detect_aruco_markers(frame):
     
     detected_markers = []
     if ids is not None:
-        for i, marker_id in enumerate(ids.flatten()):
-            # Get marker corners
-            marker_corners = corners[i][0]  # Shape: (4, 2)
-            
-            # Calculate center
-            center_x = int(np.mean(marker_corners[:, 0]))
-            center_y = int(np.mean(marker_corners[:, 1]))
-            
-            # Determine marker type
-            if marker_id in CORNER_IDS:
-                marker_type = 'corner'
-            elif PLAYER_ID_RANGE[0] <= marker_id <= PLAYER_ID_RANGE[1]:
-                marker_type = 'player'
-            elif ITEM_ID_RANGE[0] <= marker_id <= ITEM_ID_RANGE[1]:
-                marker_type = 'item'
-            else:
-                marker_type = 'custom'
-            
+        marker_ids = ids.flatten()
+        
+        # Compute all centers and type codes in one pass over the batch
+        corners_array = np.asarray(corners, dtype=np.float32).reshape(len(marker_ids), 4, 2)
+        centers = corners_array.mean(axis=1).astype(np.int32)
+        in_table = marker_ids < len(TYPE_TABLE)
+        type_codes = np.where(in_table, TYPE_TABLE[np.where(in_table, marker_ids, 0)], 3)
+        
+        for marker_id, type_code, center, marker_corners in zip(
+                marker_ids.tolist(), type_codes.tolist(), centers.tolist(), corners_array):
             detected_markers.append({{
                 'id': marker_id,
-                'type': marker_type,
-                'center': (center_x, center_y),
+                'type': TYPE_NAMES[type_code],
+                'center': tuple(center),
                 'corners': marker_corners.tolist()
             }})
     
@@ -536,12 +641,18 @@ CORNER_MAPPING = {{
 STANDARD_ITEMS = {{
 '''
         
-        for item in self.standard_items:
-            reference_code += f"    {item['id']}: '{item['name']}',  # {item['description']}\n"
+        items_block = "".join(
+            f"    {item['id']}: '{item['name']}',  # {item['description']}\n"
+            for item in self.standard_items)
         
-        reference_code += '''
+        footer = '''
 }
 
+# O(1) item name lookup by ID, filled from STANDARD_ITEMS
+ITEM_NAME_TABLE = np.empty(len(TYPE_TABLE), dtype=object)
+for _item_id, _item_name in STANDARD_ITEMS.items():
+    ITEM_NAME_TABLE[_item_id] = _item_name
+
 # Helper functions
 def get_player_number(marker_id):
     """Convert player marker ID to player number (1-16)."""
@@ -551,7 +662,9 @@ def get_player_number(marker_id):
 
 def get_item_name(marker_id):
     """Get standard item name from marker ID."""
-    return STANDARD_ITEMS.get(marker_id, f"Unknown_Item_{{marker_id}}")
+    if 0 <= marker_id < len(ITEM_NAME_TABLE) and ITEM_NAME_TABLE[marker_id] is not None:
+        return ITEM_NAME_TABLE[marker_id]
+    return f"Unknown_Item_{marker_id}"
 
 # Generate ArUco marker with version compatibility
 def generate_aruco_marker(marker_id, marker_size=200, border_bits=1):
@@ -585,11 +698,43 @@ def generate_aruco_marker(marker_id, marker_size=200, border_bits=1):
         
         ref_path = output_dir / 'aruco_detection_reference.py'
         with open(ref_path, 'w') as f:
-            f.write(reference_code)
+            f.write(header + items_block + footer)
         
         print(f"Generated detection reference: {ref_path}")
 
 
+# Per-process generators for pool workers, keyed by (dictionary, marker_size, border_bits)
+_worker_generators: Dict[Tuple[int, int, int], ArucoMarkerGenerator] = {}
+
+
+def _render_and_save(task: Tuple) -> Tuple[Dict, np.ndarray]:
+    """Render one labeled marker and write it to disk (process pool worker)."""
+    (marker_id, name, marker_type, description,
+     dictionary, marker_size, border_bits, png_params, filepath) = task
+    
+    key = (dictionary, marker_size, border_bits)
+    generator = _worker_generators.get(key)
+    if generator is None:
+        generator = ArucoMarkerGenerator(dictionary, marker_size, border_bits, verbose=False)
+        _worker_generators[key] = generator
+    
+    # Render into the generator's scratch canvas rather than a fresh array: the
+    # result is written and pickled back to the parent before this worker
+    # renders its next marker, so it is never overwritten while still in use
+    labeled_marker = generator.create_labeled_marker(marker_id, name, description,
+                                                     out=generator._label_scratch)
+    cv2.imwrite(str(filepath), labeled_marker, png_params)
+    
+    marker_info = {
+        'id': marker_id,
+        'name': name,
+        'type': marker_type,
+        'description': description,
+        'filename': filepath.name
+    }
+    return marker_info, labeled_marker
+
+
 def main():
     """Main function with command line interface."""
     parser = argparse.ArgumentParser(description="Generate ArUco markers for token tracking")
@@ -603,6 +748,10 @@ def main():
     parser.add_argument("--custom-file", help="JSON file with custom marker specifications (IDs 62+)")
     parser.add_argument("--no-sheets", action="store_true", help="Don't create print sheets")
     parser.add_argument("--markers-per-row", type=int, default=4, help="Markers per row in print sheets")
+    parser.add_argument("--png-compression", type=int, default=1, choices=range(10), metavar="0-9",
+                        help="PNG compression level (default: 1, fast encode)")
+    parser.add_argument("--pdf", action="store_true", help="Write print sheets as one multi-page PDF instead of PNGs")
+    parser.add_argument("--dump-tiff", action="store_true", help="Also write all markers to a single multi-page TIFF")
     
     args = parser.parse_args()
     
@@ -616,8 +765,9 @@ def main():
     output_dir.mkdir(exist_ok=True)
     
     # Initialize generator
-    generator = ArucoMarkerGenerator(marker_size=args.marker_size)
+    generator = ArucoMarkerGenerator(marker_size=args.marker_size, png_compression=args.png_compression)
     all_markers = []
+    sheets = []  # (markers, sheet name, markers per row) for each print sheet
     
     print(f"ArUco Marker Generator - OpenCV {generator.opencv_version}")
     print(f"======================================================")
@@ -638,11 +788,10 @@ def main():
         all_markers.extend(marker_sets['players'])
         all_markers.extend(marker_sets['items'])
         
-        # Create category-specific print sheets
-        if not args.no_sheets:
-            generator.create_print_sheet(marker_sets['corners'], output_dir, "Corner Markers", 2)
-            generator.create_print_sheet(marker_sets['players'], output_dir, "Player Markers", args.markers_per_row)
-            generator.create_print_sheet(marker_sets['items'], output_dir, "Item Markers", args.markers_per_row)
+        # Category-specific print sheets
+        sheets.append((marker_sets['corners'], "Corner Markers", 2))
+        sheets.append((marker_sets['players'], "Player Markers", args.markers_per_row))
+        sheets.append((marker_sets['items'], "Item Markers", args.markers_per_row))
     
     else:
         # Generate individual categories
@@ -650,22 +799,19 @@ def main():
             corner_markers = generator.generate_corner_markers(output_dir)
             all_markers.extend(corner_markers)
             
-            if not args.no_sheets:
-                generator.create_print_sheet(corner_markers, output_dir, "Corner Markers", 2)
+            sheets.append((corner_markers, "Corner Markers", 2))
         
         if not args.corner_only and not args.items_only:
             player_markers = generator.generate_player_markers(output_dir, args.player_count)
             all_markers.extend(player_markers)
             
-            if not args.no_sheets:
-                generator.create_print_sheet(player_markers, output_dir, "Player Markers", args.markers_per_row)
+            sheets.append((player_markers, "Player Markers", args.markers_per_row))
         
         if args.items_only or (not args.corner_only and not args.players_only):
             item_markers = generator.generate_standard_items(output_dir)
             all_markers.extend(item_markers)
             
-            if not args.no_sheets:
-                generator.create_print_sheet(item_markers, output_dir, "Item Markers", args.markers_per_row)
+            sheets.append((item_markers, "Item Markers", args.markers_per_row))
     
     # Generate custom markers if specified
     custom_markers = []
@@ -676,13 +822,23 @@ def main():
             custom_markers = generator.generate_custom_markers(output_dir, custom_specs)
             all_markers.extend(custom_markers)
             
-            if not args.no_sheets and custom_markers:
-                generator.create_print_sheet(custom_markers, output_dir, "Custom Markers", args.markers_per_row)
+            sheets.append((custom_markers, "Custom Markers", args.markers_per_row))
         except Exception as e:
             print(f"Error loading custom markers: {e}")
     
+    # Create print sheets, either as individual PNGs or as pages of one PDF
+    if not args.no_sheets:
+        if args.pdf:
+            generator.create_print_pdf(sheets, output_dir)
+        else:
+            for markers, sheet_name, per_row in sheets:
+                if markers:
+                    generator.create_print_sheet(markers, output_dir, sheet_name, per_row)
+    
     # Save marker database and reference
     generator.save_marker_database(output_dir, all_markers)
+    if args.dump_tiff:
+        generator.save_marker_tiff(all_markers, output_dir)
     generator.generate_detection_reference(output_dir)
     
     print()
@@ -701,10 +857,12 @@ def main():
     print("Files created:")
     print(f"  - Individual markers: {len(all_markers)} PNG files")
     if not args.no_sheets:
-        print(f"  - Print sheets: Ready-to-print layouts")
+        print(f"  - Print sheets: Ready-to-print layouts{' (markers.pdf)' if args.pdf else ''}")
     print(f"  - marker_database.json: Complete marker reference")
     print(f"  - quick_reference.txt: Human-readable marker list")
     print(f"  - aruco_detection_reference.py: Detection code example")
+    if args.dump_tiff:
+        print(f"  - all_markers.tiff: All markers in one multi-page TIFF")
     print()
     if args.complete:
         print("COMPLETE SET GENERATED! 🎉")
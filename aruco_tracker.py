@@ -14,13 +14,13 @@ ArUco Marker Schema (Optimized for smaller markers):
 
 Requirements:
 - Raspberry Pi with camera module
-- Python packages: picamera2, opencv-python, numpy, websockets, requests
+- Python packages: picamera2, opencv-python, numpy, websockets, aiohttp
 - Foundry VTT with compatible module
 
 Installation:
 sudo apt update
 sudo apt install python3-opencv python3-numpy
-pip3 install picamera2 websockets requests aiohttp opencv-python numpy
+pip3 install picamera2 websockets aiohttp opencv-python numpy
 
 Usage:
 python3 foundry_aruco_tracker.py --foundry-url "http://192.168.1.50:30000" --scene-id "your-scene-id"
@@ -32,23 +32,86 @@ from picamera2 import Picamera2
 import time
 import json
 import asyncio
+import heapq
 import websockets
-import requests
+import aiohttp
 import argparse
-from dataclasses import dataclass, asdict
+import os
+import sys
+import struct
+from dataclasses import dataclass, replace
 from typing import List, Dict, Tuple, Optional, Callable
 import threading
 import queue
 import logging
 from pathlib import Path
 
+from aruco_detection import tuned_parameters
+
+# Optional faster JSON encoder for WebSocket messages and the token export file
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_text(obj) -> str:
+    """Compact JSON text for a WebSocket text frame (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'))
+
+
+# Overlay font
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+# Short item names for the overlay display
+ITEM_SHORT_NAMES = {
+    30: "Gob", 31: "Orc", 32: "Ske", 33: "Drg", 34: "Trl", 35: "Wiz", 36: "Bst", 37: "Dem",
+    40: "Chr", 41: "Mag", 42: "Gld", 43: "Pot", 44: "Wpn", 45: "Arm", 46: "Scr", 47: "Key",
+    50: "Mer", 51: "Grd", 52: "Nob", 53: "Inn", 54: "Pri", 55: "Dor", 56: "Trp", 57: "Fir",
+    58: "Alt", 59: "Por", 60: "Veh", 61: "Obj"
+}
+
+
+# ID ranges for the optimized schema (inclusive); SurfaceCalibrator uses the same
+PLAYER_ID_RANGE = (10, 25)  # 16 players
+ITEM_ID_RANGE = (30, 61)    # 32 standard items
+
+# Marker ID lookups for the optimized schema (DICT_6X6_250 IDs are < 256)
+CORNER_IDS = frozenset(range(4))
+MARKER_TYPE_LUT = np.full(256, 'custom', dtype=object)
+MARKER_TYPE_LUT[PLAYER_ID_RANGE[0]:PLAYER_ID_RANGE[1] + 1] = 'player'
+MARKER_TYPE_LUT[ITEM_ID_RANGE[0]:ITEM_ID_RANGE[1] + 1] = 'item'
+
+
+def _label_prefix(aruco_id: int, marker_type: str) -> str:
+    """Short overlay label for a marker ID."""
+    if marker_type == 'player':
+        return f"P{aruco_id - PLAYER_ID_RANGE[0] + 1}"
+    if marker_type == 'item':
+        return ITEM_SHORT_NAMES.get(aruco_id, f"I{aruco_id}")
+    return f"C{aruco_id}"
+
+
+# Binary WebSocket framing (used when FoundryIntegrator.binary_protocol is set).
+# Header: message type, token count. Each token: aruco_id, x, y, confidence,
+# marker type code, token_id byte length, followed by the UTF-8 token_id.
+BINARY_MSG_TOKEN_UPDATE_BATCH = 1
+BINARY_HEADER = struct.Struct("<HH")
+BINARY_TOKEN = struct.Struct("<IfffBB")
+MARKER_TYPE_CODES = {'player': 0, 'item': 1, 'custom': 2}
+
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Slotted dataclasses need Python 3.10+; older versions fall back to plain ones
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ArucoToken:
     """Represents a detected ArUco marker token."""
     id: int
@@ -59,9 +122,11 @@ class ArucoToken:
     corners: List[Tuple[int, int]]
     marker_type: str
     foundry_token_id: Optional[str] = None
+    center: Tuple[int, int] = (0, 0)  # Camera pixel center
+    label_prefix: str = ""  # Short overlay label, e.g. "P7", "Gob", "C70"
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class FoundryConfig:
     """Configuration for Foundry VTT integration."""
     base_url: str
@@ -78,16 +143,53 @@ class FoundryIntegrator:
     
     def __init__(self, config: FoundryConfig):
         self.config = config
-        self.session = requests.Session()
+        self._http = None  # aiohttp session, created on first HTTP call
         self.websocket = None
         self.token_mapping = {}  # ArUco ID -> Foundry Token ID
+        self._token_lookups: Dict[int, asyncio.Task] = {}  # Lookups in flight
+        self._lookup_retry_at: Dict[int, float] = {}  # ArUco ID -> earliest retry time
+        self.lookup_retry_interval = 5.0  # Seconds before retrying a failed lookup
+        self._scene_tokens_cache = (None, 0.0)  # (scene token list, fetch time)
+        self._scene_tokens_fetch = None  # In-flight scene token request shared by lookups
+        self.scene_tokens_ttl = 5.0  # Seconds to reuse the scene token list
         self.connection_active = False
+        self._reconnect_task = None
+        self._close_watch_task = None  # Notices the socket closing even when nothing is sent
+        self.reconnect_max_delay = 30.0  # Seconds; reconnect backoff doubles up to this
+        self._last_export_hash = None  # Pixel-quantized snapshot of the last export
+        
+        # Last position sent per ArUco ID: (token_id, x, y) in Foundry pixels
+        self._last_sent: Dict[int, Tuple[Optional[str], int, int]] = {}
+        self.min_move = 2  # Foundry pixels (|dx| + |dy|) before a token is re-sent
+        
+        # Surface -> scene scale factors, cached per surface/scene size
+        self._scale_key = None
+        self._scale = None
+        
+        # Send binary frames instead of JSON (the Foundry module decodes both)
+        self.binary_protocol = False
+        
+        # Batch message reused every tick; only updates and timestamp change
+        self._batch_template = {
+            "type": "token_update_batch",
+            "scene_id": config.scene_id,
+            "updates": None,
+            "timestamp": 0.0
+        }
         
         # Set up authentication if API key provided
+        self._http_headers = {}
         if config.api_key:
-            self.session.headers.update({
-                'Authorization': f'Bearer {config.api_key}'
-            })
+            self._http_headers['Authorization'] = f'Bearer {config.api_key}'
+    
+    async def _ensure_http(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating its keep-alive pool on first use."""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                headers=self._http_headers,
+                connector=aiohttp.TCPConnector(limit_per_host=8, keepalive_timeout=30)
+            )
+        return self._http
     
     async def connect_websocket(self):
         """Connect to Foundry via WebSocket for real-time updates."""
@@ -108,6 +210,9 @@ class FoundryIntegrator:
                 ping_timeout=10
             )
             self.connection_active = True
+            self._last_sent.clear()  # A (re)started Foundry needs every position again
+            self._close_watch_task = asyncio.get_running_loop().create_task(
+                self._watch_close(self.websocket))
             logger.info("Connected to Foundry WebSocket")
             
             # Send initial handshake with network info
@@ -119,19 +224,57 @@ class FoundryIntegrator:
                 "marker_system": "aruco",
                 "timestamp": time.time()
             }
-            await self.websocket.send(json.dumps(handshake))
+            await self.websocket.send(_json_text(handshake))
             
         except Exception as e:
             logger.error(f"Failed to connect to Foundry WebSocket: {e}")
             logger.error(f"Ensure Foundry host {host} is accessible and WebSocket port {self.config.websocket_port} is open")
-            self.connection_active = False
+            self._connection_lost()
+    
+    async def _watch_close(self, websocket):
+        """Start reconnecting as soon as the socket closes, even while no updates are sent."""
+        await websocket.wait_closed()
+        if websocket is self.websocket and self.connection_active:
+            logger.warning("Foundry WebSocket closed")
+            self._connection_lost()
+    
+    def _connection_lost(self):
+        """Mark the WebSocket as down and start reconnecting in the background."""
+        self.connection_active = False
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+    
+    async def _reconnect(self):
+        """Reconnect the WebSocket with exponential backoff (1 s, 2 s, 4 s, ...)."""
+        delay = 1.0
+        while not self.connection_active:
+            logger.info(f"Reconnecting to Foundry WebSocket in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            await self.connect_websocket()
+            delay = min(delay * 2, self.reconnect_max_delay)
     
     async def disconnect_websocket(self):
         """Disconnect from Foundry WebSocket."""
+        for task in (self._reconnect_task, self._close_watch_task):
+            if task is not None:
+                task.cancel()
+        self._reconnect_task = None
+        self._close_watch_task = None
+        
         if self.websocket:
             await self.websocket.close()
             self.connection_active = False
             logger.info("Disconnected from Foundry WebSocket")
+        
+        for task in list(self._token_lookups.values()):
+            task.cancel()
+        if self._scene_tokens_fetch is not None:
+            self._scene_tokens_fetch.cancel()
+            self._scene_tokens_fetch = None
+        
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
     
     def surface_to_foundry_coords(self, surface_x: float, surface_y: float, 
                                   surface_width: float, surface_height: float) -> Tuple[int, int]:
@@ -146,34 +289,101 @@ class FoundryIntegrator:
         
         return foundry_x, foundry_y
     
-    async def update_token_position_ws(self, aruco_token: ArucoToken, surface_width: float, surface_height: float):
-        """Update token position via WebSocket."""
+    def surface_to_foundry_coords_batch(self, tokens: List[ArucoToken],
+                                        surface_width: float, surface_height: float) -> List[List[int]]:
+        """Convert the surface positions of several tokens to Foundry scene coordinates."""
+        if not tokens:
+            return []
+        
+        # Scale factors only change when the surface or scene size does
+        scale_key = (surface_width, surface_height, self.config.scene_width, self.config.scene_height)
+        if self._scale_key != scale_key:
+            self._scale = np.array([self.config.scene_width / surface_width,
+                                    self.config.scene_height / surface_height])
+            self._scale_key = scale_key
+        
+        points = np.array([(token.x, token.y) for token in tokens], dtype=np.float64)
+        return (points * self._scale).astype(np.int32).tolist()
+    
+    def _build_token_update(self, aruco_token: ArucoToken, foundry_x: int, foundry_y: int) -> Dict:
+        """Build the per-token update payload (no I/O)."""
+        return {
+            "aruco_id": aruco_token.id,
+            "token_id": aruco_token.foundry_token_id,
+            "x": foundry_x,
+            "y": foundry_y,
+            "confidence": aruco_token.confidence,
+            "marker_type": aruco_token.marker_type
+        }
+    
+    async def update_token_positions_ws(self, aruco_tokens: List[ArucoToken], surface_width: float, surface_height: float):
+        """Send position updates for all tokens as a single batched WebSocket message."""
         if not self.connection_active or not self.websocket:
             return False
         
+        # Only send tokens that moved at least min_move since the last send;
+        # smaller changes are detection jitter
+        mapped_tokens = [token for token in aruco_tokens if token.foundry_token_id]
+        foundry_coords = self.surface_to_foundry_coords_batch(mapped_tokens, surface_width, surface_height)
+        updates = []
+        sent_positions = {}
+        for token, (foundry_x, foundry_y) in zip(mapped_tokens, foundry_coords):
+            last = self._last_sent.get(token.id)
+            if (last is not None and last[0] == token.foundry_token_id
+                    and abs(last[1] - foundry_x) + abs(last[2] - foundry_y) < self.min_move):
+                continue
+            updates.append(self._build_token_update(token, foundry_x, foundry_y))
+            sent_positions[token.id] = (token.foundry_token_id, foundry_x, foundry_y)
+        if not updates:
+            return True
+        
+        if self.binary_protocol:
+            sent = await self._send_binary_batch(updates)
+            if sent:
+                self._last_sent.update(sent_positions)
+            return sent
+        
         try:
-            foundry_x, foundry_y = self.surface_to_foundry_coords(
-                aruco_token.x, aruco_token.y, surface_width, surface_height)
+            batch_message = self._batch_template
+            batch_message["updates"] = updates
+            batch_message["timestamp"] = time.time()
             
-            update_message = {
-                "type": "token_update",
-                "scene_id": self.config.scene_id,
-                "aruco_id": aruco_token.id,
-                "token_id": aruco_token.foundry_token_id,
-                "x": foundry_x,
-                "y": foundry_y,
-                "confidence": aruco_token.confidence,
-                "marker_type": aruco_token.marker_type
-            }
-            
-            await self.websocket.send(json.dumps(update_message))
+            # Sent as text frames, which is what the Foundry module expects
+            await self.websocket.send(_json_text(batch_message))
+            self._last_sent.update(sent_positions)
             return True
             
+        except websockets.ConnectionClosed as e:
+            logger.error(f"Foundry WebSocket connection lost: {e}")
+            self._connection_lost()
+            return False
         except Exception as e:
             logger.error(f"Failed to send WebSocket update: {e}")
             return False
     
-    def update_token_position_http(self, aruco_token: ArucoToken, surface_width: float, surface_height: float):
+    async def _send_binary_batch(self, updates: List[Dict]) -> bool:
+        """Send token updates as a single binary WebSocket frame."""
+        try:
+            buf = bytearray(BINARY_HEADER.pack(BINARY_MSG_TOKEN_UPDATE_BATCH, len(updates)))
+            for update in updates:
+                token_id = update["token_id"].encode('utf-8')
+                buf += BINARY_TOKEN.pack(
+                    update["aruco_id"], update["x"], update["y"], update["confidence"],
+                    MARKER_TYPE_CODES.get(update["marker_type"], 2), len(token_id))
+                buf += token_id
+            
+            await self.websocket.send(bytes(buf))
+            return True
+            
+        except websockets.ConnectionClosed as e:
+            logger.error(f"Foundry WebSocket connection lost: {e}")
+            self._connection_lost()
+            return False
+        except Exception as e:
+            logger.error(f"Failed to send binary WebSocket update: {e}")
+            return False
+    
+    async def update_token_position_http(self, aruco_token: ArucoToken, surface_width: float, surface_height: float):
         """Update token position via HTTP API."""
         try:
             foundry_x, foundry_y = self.surface_to_foundry_coords(
@@ -188,15 +398,20 @@ class FoundryIntegrator:
                 "_id": aruco_token.foundry_token_id
             }
             
-            response = self.session.patch(url, json=payload)
-            return response.status_code == 200
+            http = await self._ensure_http()
+            async with http.patch(url, json=payload) as response:
+                return response.status == 200
             
         except Exception as e:
             logger.error(f"Failed to send HTTP update: {e}")
             return False
     
-    def create_or_find_token(self, aruco_id: int, marker_type: str) -> Optional[str]:
+    async def create_or_find_token(self, aruco_id: int, marker_type: str) -> Optional[str]:
         """Create or find a token in Foundry for the ArUco ID."""
+        # Markers that come back after a timeout keep their token
+        if aruco_id in self.token_mapping:
+            return self.token_mapping[aruco_id]
+        
         try:
             # Generate token name based on marker type and ID
             if marker_type == 'player':
@@ -216,15 +431,15 @@ class FoundryIntegrator:
             
             # First, try to find existing token
             url = f"{self.config.base_url}/api/scenes/{self.config.scene_id}/tokens"
-            response = self.session.get(url)
+            http = await self._ensure_http()
+            tokens = await self._get_scene_tokens(url)
             
-            if response.status_code == 200:
-                tokens = response.json()
-                for token in tokens:
-                    if (token.get('name') == token_name or 
-                        token.get('flags', {}).get('aruco_id') == aruco_id):
-                        logger.info(f"Found existing token for ArUco {aruco_id}: {token['_id']}")
-                        return token['_id']
+            for token in tokens:
+                if (token.get('name') == token_name or 
+                    token.get('flags', {}).get('aruco_id') == aruco_id):
+                    logger.info(f"Found existing token for ArUco {aruco_id}: {token['_id']}")
+                    self.token_mapping[aruco_id] = token['_id']
+                    return token['_id']
             
             # Create new token if not found
             create_payload = {
@@ -241,19 +456,77 @@ class FoundryIntegrator:
                 }
             }
             
-            response = self.session.post(url, json=create_payload)
-            if response.status_code == 201:
-                token_data = response.json()
-                logger.info(f"Created new token for ArUco {aruco_id}: {token_data['_id']}")
-                return token_data['_id']
+            async with http.post(url, json=create_payload) as response:
+                if response.status == 201:
+                    token_data = await response.json()
+                    logger.info(f"Created new token for ArUco {aruco_id}: {token_data['_id']}")
+                    self.token_mapping[aruco_id] = token_data['_id']
+                    return token_data['_id']
             
         except Exception as e:
             logger.error(f"Failed to create/find token for ArUco {aruco_id}: {e}")
         
         return None
     
+    async def _get_scene_tokens(self, url: str) -> List[Dict]:
+        """Get the scene token list, cached for scene_tokens_ttl seconds.
+        
+        Lookups that miss the cache at the same time all await one shared request.
+        """
+        tokens, fetched_at = self._scene_tokens_cache
+        if tokens is not None and time.time() - fetched_at < self.scene_tokens_ttl:
+            return tokens
+        
+        if self._scene_tokens_fetch is None or self._scene_tokens_fetch.done():
+            self._scene_tokens_fetch = asyncio.get_running_loop().create_task(
+                self._fetch_scene_tokens(url))
+        # Shielded so one cancelled lookup does not cancel the request for the others
+        return await asyncio.shield(self._scene_tokens_fetch)
+    
+    async def _fetch_scene_tokens(self, url: str) -> List[Dict]:
+        """Fetch the scene token list and refresh the cache."""
+        http = await self._ensure_http()
+        async with http.get(url) as response:
+            tokens = await response.json() if response.status == 200 else []
+        self._scene_tokens_cache = (tokens, time.time())
+        return tokens
+    
+    def lookup_token_id(self, aruco_id: int, marker_type: str) -> Optional[str]:
+        """Get the Foundry token ID for a marker without waiting on the network.
+        
+        On a cache miss a background create_or_find_token is started (at most one
+        per marker at a time) and None is returned; later calls pick up the result.
+        """
+        token_id = self.token_mapping.get(aruco_id)
+        if token_id is not None or aruco_id in self._token_lookups:
+            return token_id
+        if time.time() < self._lookup_retry_at.get(aruco_id, 0.0):
+            return None
+        
+        task = asyncio.get_running_loop().create_task(
+            self.create_or_find_token(aruco_id, marker_type))
+        self._token_lookups[aruco_id] = task
+        task.add_done_callback(lambda done, aruco_id=aruco_id: self._lookup_done(aruco_id, done))
+        return None
+    
+    def _lookup_done(self, aruco_id: int, task: asyncio.Task):
+        """Record a finished lookup, scheduling a retry if it found nothing."""
+        self._token_lookups.pop(aruco_id, None)
+        token_id = None if task.cancelled() else task.result()
+        if token_id is None:
+            self._lookup_retry_at[aruco_id] = time.time() + self.lookup_retry_interval
+        else:
+            self.token_mapping[aruco_id] = token_id
+    
     def export_to_foundry_module(self, tokens: List[ArucoToken], surface_width: float, surface_height: float):
         """Export token data to a file that a Foundry module can read."""
+        # Skip the rewrite when no token moved by a whole pixel
+        export_key = tuple((t.id, round(t.x), round(t.y), t.foundry_token_id)
+                           for t in sorted(tokens, key=lambda t: t.id))
+        export_hash = hash(export_key)
+        if export_hash == self._last_export_hash:
+            return
+        
         output_data = {
             "timestamp": time.time(),
             "scene_id": self.config.scene_id,
@@ -261,10 +534,8 @@ class FoundryIntegrator:
             "tokens": []
         }
         
-        for token in tokens:
-            foundry_x, foundry_y = self.surface_to_foundry_coords(
-                token.x, token.y, surface_width, surface_height)
-            
+        foundry_coords = self.surface_to_foundry_coords_batch(tokens, surface_width, surface_height)
+        for token, (foundry_x, foundry_y) in zip(tokens, foundry_coords):
             token_data = {
                 "aruco_id": token.id,
                 "foundry_token_id": token.foundry_token_id,
@@ -278,8 +549,17 @@ class FoundryIntegrator:
         
         # Write to file that Foundry module can monitor
         output_path = Path("foundry_token_data.json")
-        with open(output_path, 'w') as f:
-            json.dump(output_data, f, indent=2)
+        if orjson is not None:
+            payload = orjson.dumps(output_data)
+        else:
+            payload = json.dumps(output_data, separators=(',', ':')).encode('utf-8')
+        
+        # Write atomically so the module never reads a half-written file
+        tmp_path = output_path.with_name(output_path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, output_path)
+        self._last_export_hash = export_hash
 
 
 class SurfaceCalibrator:
@@ -300,8 +580,8 @@ class SurfaceCalibrator:
         }
         
         # ID ranges for optimized schema (smaller markers)
-        self.player_id_range = (10, 25)  # 16 players
-        self.item_id_range = (30, 61)    # 32 standard items
+        self.player_id_range = PLAYER_ID_RANGE
+        self.item_id_range = ITEM_ID_RANGE
     
     def calibrate_surface(self, frame: np.ndarray, tracker) -> bool:
         """Calibrate the surface by detecting corner markers or manual selection."""
@@ -312,11 +592,11 @@ class SurfaceCalibrator:
         if self._detect_corner_markers(frame, tracker):
             return True
         
-        return self._manual_corner_selection(frame)
+        return self._manual_corner_selection(tracker.frame_to_display(frame))
     
     def _detect_corner_markers(self, frame: np.ndarray, tracker) -> bool:
         """Detect corner markers automatically."""
-        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        gray = tracker.frame_to_gray(frame)
         
         # Use the tracker's detection method to maintain consistency
         if hasattr(tracker, 'use_new_api') and tracker.use_new_api and tracker.detector is not None:
@@ -330,14 +610,12 @@ class SurfaceCalibrator:
         corner_positions = {}
         
         if ids is not None:
-            for i, marker_id in enumerate(ids.flatten()):
+            # Center points of all markers at once
+            centers = np.asarray(corners, dtype=np.float32).reshape(-1, 4, 2).mean(axis=1).astype(int)
+            for marker_id, center in zip(ids.flatten().tolist(), centers.tolist()):
                 if marker_id in self.corner_mapping:
-                    # Get center point of ArUco marker
-                    marker_corners = corners[i][0]  # Shape: (4, 2)
-                    center_x = int(np.mean(marker_corners[:, 0]))
-                    center_y = int(np.mean(marker_corners[:, 1]))
                     corner_name = self.corner_mapping[marker_id]
-                    corner_positions[corner_name] = (center_x, center_y)
+                    corner_positions[corner_name] = tuple(center)
         
         if len(corner_positions) == 4:
             self.surface_corners = np.array([
@@ -402,18 +680,25 @@ class SurfaceCalibrator:
     
     def camera_to_surface_coords(self, camera_x: int, camera_y: int) -> Tuple[float, float]:
         """Convert camera coordinates to surface coordinates."""
+        surface_x, surface_y = self.camera_to_surface_coords_batch(
+            np.array([[camera_x, camera_y]], dtype=np.float32))[0]
+        return float(surface_x), float(surface_y)
+    
+    def camera_to_surface_coords_batch(self, points: np.ndarray) -> np.ndarray:
+        """Convert an (N, 2) array of camera coordinates to surface coordinates."""
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
         if self.transform_matrix is None:
-            return float(camera_x), float(camera_y)
+            return points
         
-        point = np.array([[[camera_x, camera_y]]], dtype=np.float32)
-        transformed = cv2.perspectiveTransform(point, self.transform_matrix)
-        return float(transformed[0][0][0]), float(transformed[0][0][1])
+        transformed = cv2.perspectiveTransform(points.reshape(-1, 1, 2), self.transform_matrix)
+        return transformed.reshape(-1, 2)
 
 
 class FoundryArucoTracker:
     """Main ArUco tracking system with Foundry VTT integration."""
     
-    def __init__(self, foundry_config: FoundryConfig, surface_width: int = 1000, surface_height: int = 1000):
+    def __init__(self, foundry_config: FoundryConfig, surface_width: int = 1000, surface_height: int = 1000,
+                 detector_params: Optional[Dict] = None):
         self.picam = None
         self.calibrator = SurfaceCalibrator()
         self.calibrator.surface_width = surface_width
@@ -429,6 +714,9 @@ class FoundryArucoTracker:
             # Older OpenCV versions use DetectorParameters_create()
             self.parameters = cv2.aruco.DetectorParameters_create()
         
+        # Apply speed-tuned defaults plus any caller overrides
+        tuned_parameters(self.parameters, **(detector_params or {}))
+        
         # Check OpenCV version for detector initialization
         self.opencv_version = cv2.__version__
         opencv_major = int(self.opencv_version.split('.')[0])
@@ -448,9 +736,53 @@ class FoundryArucoTracker:
         
         self.foundry = FoundryIntegrator(foundry_config)
         self.tracked_tokens: Dict[int, ArucoToken] = {}
+        self._expiry_heap: List[Tuple[float, int]] = []  # (last_seen, aruco_id), oldest first
         self.token_timeout = 3.0
         self.running = False
         
+        # Camera frames are YUV420; the Y plane is used directly for detection
+        self.frame_size = (1280, 720)
+        
+        # Grayscale buffer reused every frame for non-YUV frames
+        self._gray_buf = None
+        
+        # Detection runs on a frame downscaled by this factor (1 = full resolution).
+        # 2 halves the detection cost but loses markers under ~32px per side.
+        self.detect_scale = 1
+        # With detect_scale > 1, a downscaled frame that misses markers seen at full
+        # resolution is retried at full resolution next frame, and every
+        # full_res_hold frames a full-resolution pass looks for new small markers.
+        # Once full resolution finds markers the downscaled pass missed, it stays
+        # on until it has found none for full_res_hold frames.
+        self.full_res_hold = 30
+        self._retry_full_res = True  # Start at full resolution
+        self._full_res_frames = 0
+        self._frames_since_full_res = 0
+        self._expected_ids = frozenset()    # Found by the last full-resolution pass
+        self._downscaled_ids = None         # Found by the last downscaled pass
+        
+        # Static scene skip: detection is reused while a 1/8-scale thumbnail shows
+        # no pixel changing by more than motion_threshold since the last detection
+        self.motion_threshold = 12
+        self.max_static_frames = 30  # Force a fresh detection at least this often
+        self._motion_ref = None
+        self._static_frames = 0
+        self._last_detections: List[ArucoToken] = []
+        
+        # Display state used by draw_overlay
+        self._header_strips = {}  # connection state -> pre-rendered status header
+        
+        # Redraw the display window every Nth frame; detection runs on every frame
+        self.display_every = 3
+        
+        # Capture thread feeds the detection worker: one frame queued (stale frames
+        # are replaced by newer ones), one result waiting
+        self._det_queue = queue.Queue(maxsize=1)
+        self._res_queue = queue.Queue(maxsize=1)
+        self._det_thread = None
+        self._capture_thread = None
+        self._capturing = False
+        
         # Update settings
         self.update_interval = 0.1  # Send updates every 100ms
         self.last_update_time = 0
@@ -460,11 +792,15 @@ class FoundryArucoTracker:
         try:
             self.picam = Picamera2()
             config = self.picam.create_preview_configuration(
-                main={"size": (1280, 720), "format": "RGB888"}
+                main={"size": self.frame_size, "format": "YUV420"}
             )
             self.picam.configure(config)
             self.picam.start()
-            time.sleep(2)
+            
+            # Let the camera warm up, doing first-use setup in the meantime
+            warm_until = time.monotonic() + 2
+            self._prewarm()
+            time.sleep(max(0.0, warm_until - time.monotonic()))
             logger.info("Camera initialized successfully!")
             logger.info(f"OpenCV version: {self.opencv_version}")
             logger.info(f"ArUco API: {'New (4.7+)' if self.use_new_api else 'Legacy (<4.7)'}")
@@ -473,6 +809,15 @@ class FoundryArucoTracker:
             logger.error(f"Failed to initialize camera: {e}")
             return False
     
+    def _prewarm(self):
+        """Run detection and overlay setup once on a blank frame."""
+        width, height = self.frame_size
+        blank = np.zeros((height * 3 // 2, width), dtype=np.uint8)  # YUV420 layout
+        self.detect_aruco_markers(blank)
+        display = self.frame_to_display(blank)
+        for connected in (True, False):
+            self._header_strip(connected, display)
+    
     def calibrate(self) -> bool:
         """Calibrate the surface area."""
         if not self.picam:
@@ -481,12 +826,49 @@ class FoundryArucoTracker:
         
         logger.info("Starting surface calibration...")
         frame = self.picam.capture_array()
+        self._motion_ref = None  # Surface coordinates change; detect afresh
         return self.calibrator.calibrate_surface(frame, self)
     
+    def frame_to_gray(self, frame: np.ndarray) -> np.ndarray:
+        """Get the grayscale image used for detection from a camera frame."""
+        if frame.ndim == 2:
+            # YUV420: the Y plane is the top width x height of the buffer
+            width, height = self.frame_size
+            return frame[:height, :width]
+        
+        if self._gray_buf is None or self._gray_buf.shape != frame.shape[:2]:
+            self._gray_buf = np.empty(frame.shape[:2], dtype=np.uint8)
+        return cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY, dst=self._gray_buf)
+    
+    def frame_to_display(self, frame: np.ndarray) -> np.ndarray:
+        """Get a BGR image for display from a camera frame."""
+        if frame.ndim == 2:
+            return cv2.cvtColor(frame, cv2.COLOR_YUV2BGR_I420)
+        return frame
+    
     def detect_aruco_markers(self, frame: np.ndarray) -> List[ArucoToken]:
         """Detect ArUco markers in the current frame."""
-        # Convert to grayscale for detection
-        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        # Grayscale view of the frame for detection
+        gray = self.frame_to_gray(frame)
+        
+        # Nothing moved since the last detection: reuse its markers
+        thumb = cv2.resize(gray, (gray.shape[1] // 8, gray.shape[0] // 8),
+                           interpolation=cv2.INTER_AREA)
+        if self._is_static(thumb):
+            self._static_frames += 1
+            now = time.time()
+            return [replace(token, last_seen=now) for token in self._last_detections]
+        self._motion_ref = thumb
+        self._static_frames = 0
+        
+        # Downscale for detection; corners are scaled back up below. Full
+        # resolution is used while small markers need it (see _update_scale_state).
+        scale = 1 if self._retry_full_res or self._full_res_frames else self.detect_scale
+        if scale == 2:
+            gray = cv2.pyrDown(gray)
+        elif scale != 1:
+            gray = cv2.resize(gray, None, fx=1.0 / scale, fy=1.0 / scale,
+                              interpolation=cv2.INTER_AREA)
         
         # Detect markers using appropriate API
         if self.use_new_api and self.detector is not None:
@@ -499,51 +881,60 @@ class FoundryArucoTracker:
         
         detected_tokens = []
         current_time = time.time()
+        self._update_scale_state(scale, frozenset(ids.flatten().tolist()) if ids is not None
+                                 else frozenset())
         
         if ids is not None:
-            for i, marker_id in enumerate(ids.flatten()):
+            # Compute geometry for all markers at once: (N, 4, 2) corner array
+            corner_array = np.asarray(corners, dtype=np.float32).reshape(-1, 4, 2)
+            if scale != 1:
+                corner_array *= scale
+            centers = corner_array.mean(axis=1).astype(np.int32)
+            corner_ints = corner_array.astype(np.int32)
+            
+            # Marker area via the shoelace formula
+            xs = corner_array[:, :, 0]
+            ys = corner_array[:, :, 1]
+            areas = 0.5 * np.abs(xs[:, 0] * (ys[:, 1] - ys[:, 3]) +
+                                 xs[:, 1] * (ys[:, 2] - ys[:, 0]) +
+                                 xs[:, 2] * (ys[:, 3] - ys[:, 1]) +
+                                 xs[:, 3] * (ys[:, 0] - ys[:, 2]))
+            confidences = np.minimum(1.0, areas / 10000.0)
+            
+            # Additional confidence check: how square is the marker?
+            sides = np.linalg.norm(corner_array - np.roll(corner_array, -1, axis=1), axis=2)
+            longest = sides.max(axis=1)
+            shortest = sides.min(axis=1)
+            square = longest > 0
+            confidences[square] *= shortest[square] / longest[square]
+            
+            # Convert all centers to surface coordinates in one call
+            surface_points = self.calibrator.camera_to_surface_coords_batch(centers).tolist()
+            
+            # Resolve every marker type with one table lookup
+            id_array = ids.flatten()
+            marker_types = MARKER_TYPE_LUT[np.minimum(id_array, 255)].tolist()
+            
+            for i, marker_id in enumerate(id_array.tolist()):
                 try:
                     # Skip corner markers for token tracking
-                    if marker_id in [0, 1, 2, 3]:
+                    if marker_id in CORNER_IDS:
                         continue
                     
-                    # Get marker corners
-                    marker_corners = corners[i][0]  # Shape: (4, 2)
-                    corner_points = [(int(x), int(y)) for x, y in marker_corners]
+                    corner_points = [tuple(point) for point in corner_ints[i].tolist()]
+                    surface_x, surface_y = surface_points[i]
                     
-                    # Calculate center point
-                    center_x = int(np.mean(marker_corners[:, 0]))
-                    center_y = int(np.mean(marker_corners[:, 1]))
+                    confidence = float(confidences[i])
+                    marker_type = marker_types[i]
                     
-                    # Convert to surface coordinates
-                    surface_x, surface_y = self.calibrator.camera_to_surface_coords(
-                        center_x, center_y)
-                    
-                    # Calculate confidence based on marker area and shape quality
-                    marker_area = cv2.contourArea(marker_corners)
-                    confidence = min(1.0, marker_area / 10000.0)
-                    
-                    # Additional confidence check: how square is the marker?
-                    rect = cv2.minAreaRect(marker_corners)
-                    width, height = rect[1]
-                    if width > 0 and height > 0:
-                        aspect_ratio = min(width, height) / max(width, height)
-                        confidence *= aspect_ratio
-                    
-                    # Determine marker type using optimized schema
-                    if self.calibrator.player_id_range[0] <= marker_id <= self.calibrator.player_id_range[1]:
-                        marker_type = 'player'
-                    elif self.calibrator.item_id_range[0] <= marker_id <= self.calibrator.item_id_range[1]:
-                        marker_type = 'item'
-                    else:
-                        marker_type = 'custom'
-                    
-                    # Get or create Foundry token ID
-                    foundry_token_id = None
-                    if marker_id in self.tracked_tokens:
-                        foundry_token_id = self.tracked_tokens[marker_id].foundry_token_id
+                    # Reuse a known Foundry token ID; new markers are resolved in send_foundry_updates
+                    previous = self.tracked_tokens.get(marker_id)
+                    if previous:
+                        foundry_token_id = previous.foundry_token_id
+                        label_prefix = previous.label_prefix
                     else:
-                        foundry_token_id = self.foundry.create_or_find_token(marker_id, marker_type)
+                        foundry_token_id = None
+                        label_prefix = _label_prefix(marker_id, marker_type)
                     
                     token = ArucoToken(
                         id=marker_id,
@@ -553,7 +944,9 @@ class FoundryArucoTracker:
                         last_seen=current_time,
                         corners=corner_points,
                         marker_type=marker_type,
-                        foundry_token_id=foundry_token_id
+                        foundry_token_id=foundry_token_id,
+                        center=tuple(centers[i].tolist()),
+                        label_prefix=label_prefix
                     )
                     detected_tokens.append(token)
                     
@@ -561,22 +954,60 @@ class FoundryArucoTracker:
                     logger.error(f"Error processing ArUco marker {marker_id}: {e}")
                     continue
         
+        self._last_detections = detected_tokens
         return detected_tokens
     
+    def _update_scale_state(self, scale: int, found_ids: frozenset):
+        """Decide whether the next detection runs at full resolution."""
+        if scale != 1:
+            # Markers seen at full resolution are missing: retry without downscaling
+            self._downscaled_ids = found_ids
+            self._frames_since_full_res += 1
+            self._retry_full_res = (not self._expected_ids <= found_ids
+                                    or self._frames_since_full_res >= self.full_res_hold)
+            return
+        
+        self._retry_full_res = False
+        if self.detect_scale == 1:
+            return
+        
+        self._frames_since_full_res = 0
+        if self._downscaled_ids is not None and found_ids - self._downscaled_ids:
+            # Markers too small for the downscaled pass are in view
+            self._full_res_frames = self.full_res_hold
+        elif self._full_res_frames:
+            self._full_res_frames -= 1
+        self._expected_ids = found_ids
+    
+    def _is_static(self, thumb: np.ndarray) -> bool:
+        """Whether the scene is unchanged since the last detected frame."""
+        if (self._motion_ref is None or self._motion_ref.shape != thumb.shape
+                or self._retry_full_res or self._static_frames >= self.max_static_frames):
+            return False
+        
+        diff = cv2.absdiff(thumb, self._motion_ref)
+        _, moved = cv2.threshold(diff, self.motion_threshold, 255, cv2.THRESH_BINARY)
+        return cv2.countNonZero(moved) == 0
+    
     def update_tracked_tokens(self, detected_tokens: List[ArucoToken]):
         """Update the tracked tokens list."""
         current_time = time.time()
         
         for token in detected_tokens:
+            previous = self.tracked_tokens.get(token.id)
+            if previous and not token.foundry_token_id:
+                token.foundry_token_id = previous.foundry_token_id
             self.tracked_tokens[token.id] = token
+            heapq.heappush(self._expiry_heap, (token.last_seen, token.id))
         
-        tokens_to_remove = []
-        for token_id, token in self.tracked_tokens.items():
-            if current_time - token.last_seen > self.token_timeout:
-                tokens_to_remove.append(token_id)
-        
-        for token_id in tokens_to_remove:
-            del self.tracked_tokens[token_id]
+        # Pop expired entries; skip ones superseded by a newer sighting
+        expiry_heap = self._expiry_heap
+        cutoff = current_time - self.token_timeout
+        while expiry_heap and expiry_heap[0][0] < cutoff:
+            last_seen, token_id = heapq.heappop(expiry_heap)
+            token = self.tracked_tokens.get(token_id)
+            if token is not None and token.last_seen == last_seen:
+                del self.tracked_tokens[token_id]
     
     async def send_foundry_updates(self):
         """Send token updates to Foundry VTT."""
@@ -587,22 +1018,46 @@ class FoundryArucoTracker:
         
         active_tokens = list(self.tracked_tokens.values())
         
-        # Send WebSocket updates
+        # Look up or create Foundry tokens for newly seen markers in the
+        # background; their IDs are filled in on a later tick
+        for token in active_tokens:
+            if not token.foundry_token_id:
+                token.foundry_token_id = self.foundry.lookup_token_id(token.id, token.marker_type)
+        
+        # Send all WebSocket updates in one message
         if self.foundry.connection_active:
-            for token in active_tokens:
-                if token.foundry_token_id:
-                    await self.foundry.update_token_position_ws(
-                        token, self.calibrator.surface_width, self.calibrator.surface_height)
+            await self.foundry.update_token_positions_ws(
+                active_tokens, self.calibrator.surface_width, self.calibrator.surface_height)
         
-        # Export for Foundry module
-        self.foundry.export_to_foundry_module(
-            active_tokens, self.calibrator.surface_width, self.calibrator.surface_height)
+        # Export for Foundry module; the file is only a fallback while the
+        # WebSocket is down
+        if not self.foundry.connection_active:
+            self.foundry.export_to_foundry_module(
+                active_tokens, self.calibrator.surface_width, self.calibrator.surface_height)
         
         self.last_update_time = current_time
     
+    def _header_strip(self, connected: bool, frame: np.ndarray) -> np.ndarray:
+        """Get the pre-rendered status header for a connection state."""
+        strip = self._header_strips.get(connected)
+        if strip is None or strip.shape[2:] != frame.shape[2:]:
+            connection_status = "FOUNDRY: CONNECTED" if connected else "FOUNDRY: DISCONNECTED"
+            status_color = (0, 255, 0) if connected else (0, 0, 255)
+            status_width = cv2.getTextSize(connection_status, FONT, 0.6, 2)[0][0]
+            title_width = cv2.getTextSize("ArUco Tracking (DICT_6X6_250)", FONT, 0.5, 1)[0][0]
+            width = min(frame.shape[1], max(status_width, title_width) + 20)
+            
+            strip = np.zeros((70, width) + frame.shape[2:], dtype=frame.dtype)
+            cv2.putText(strip, connection_status, (10, 30), FONT, 0.6, status_color, 2)
+            cv2.putText(strip, "ArUco Tracking (DICT_6X6_250)", (10, 60),
+                       FONT, 0.5, (255, 255, 255), 1)
+            self._header_strips[connected] = strip
+        return strip
+    
     def draw_overlay(self, frame: np.ndarray) -> np.ndarray:
-        """Draw tracking overlay on the frame."""
-        overlay_frame = frame.copy()
+        """Draw tracking overlay on the frame (in place)."""
+        # The display frame is not needed afterwards, so no copy is made
+        overlay_frame = frame
         
         if self.calibrator.surface_corners is not None:
             corners = self.calibrator.surface_corners.astype(int)
@@ -615,8 +1070,7 @@ class FoundryArucoTracker:
             
             # Draw center and info
             if token.corners:
-                center_x = sum(c[0] for c in token.corners) // len(token.corners)
-                center_y = sum(c[1] for c in token.corners) // len(token.corners)
+                center_x, center_y = token.center
                 
                 cv2.circle(overlay_frame, (center_x, center_y), 5, (0, 0, 255), -1)
                 
@@ -624,44 +1078,103 @@ class FoundryArucoTracker:
                 status_color = (0, 255, 0) if token.foundry_token_id else (0, 0, 255)
                 status_text = "✓ FOUNDRY" if token.foundry_token_id else "✗ NO TOKEN"
                 
-                # Generate label based on marker type
-                if token.marker_type == 'player':
-                    player_num = token.id - 10 + 1
-                    label = f"P{player_num} | {status_text}"
-                elif token.marker_type == 'item':
-                    # Short item names for display
-                    item_short_names = {
-                        30: "Gob", 31: "Orc", 32: "Ske", 33: "Drg", 34: "Trl", 35: "Wiz", 36: "Bst", 37: "Dem",
-                        40: "Chr", 41: "Mag", 42: "Gld", 43: "Pot", 44: "Wpn", 45: "Arm", 46: "Scr", 47: "Key",
-                        50: "Mer", 51: "Grd", 52: "Nob", 53: "Inn", 54: "Pri", 55: "Dor", 56: "Trp", 57: "Fir",
-                        58: "Alt", 59: "Por", 60: "Veh", 61: "Obj"
-                    }
-                    short_name = item_short_names.get(token.id, f"I{token.id}")
-                    label = f"{short_name} | {status_text}"
-                else:
-                    label = f"C{token.id} | {status_text}"
+                label = f"{token.label_prefix} | {status_text}"
                 
                 cv2.putText(overlay_frame, label,
                            (center_x + 10, center_y - 10),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.4, status_color, 1)
+                           FONT, 0.4, status_color, 1)
                 
                 coord_label = f"({token.x:.0f}, {token.y:.0f})"
                 cv2.putText(overlay_frame, coord_label,
                            (center_x + 10, center_y + 10),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+                           FONT, 0.4, (255, 255, 255), 1)
         
-        # Connection status
-        connection_status = "FOUNDRY: CONNECTED" if self.foundry.connection_active else "FOUNDRY: DISCONNECTED"
-        status_color = (0, 255, 0) if self.foundry.connection_active else (0, 0, 255)
-        cv2.putText(overlay_frame, connection_status, (10, 30),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, status_color, 2)
-        
-        # ArUco status
-        cv2.putText(overlay_frame, "ArUco Tracking (DICT_6X6_250)", (10, 60),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        # Connection and ArUco status, copied from a pre-rendered strip
+        strip = self._header_strip(self.foundry.connection_active, overlay_frame)
+        strip_height, strip_width = strip.shape[:2]
+        overlay_frame[:strip_height, :strip_width] = strip
         
         return overlay_frame
     
+    def _detection_worker(self):
+        """Run marker detection on queued frames until a None sentinel arrives."""
+        while True:
+            frame = self._det_queue.get()
+            if frame is None:
+                break
+            try:
+                detected_tokens = self.detect_aruco_markers(frame)
+            except Exception as e:
+                logger.error(f"Detection failed: {e}")
+                detected_tokens = []
+            self._res_queue.put((frame, detected_tokens))
+    
+    def _capture_loop(self):
+        """Capture frames continuously, replacing any frame detection has not taken yet."""
+        while self._capturing:
+            try:
+                frame = self.picam.capture_array()
+            except Exception as e:
+                logger.error(f"Frame capture failed: {e}")
+                self._capturing = False
+                break
+            
+            # This thread is the only producer, so after dropping the stale
+            # frame there is always room for the new one
+            try:
+                self._det_queue.put_nowait(frame)
+            except queue.Full:
+                try:
+                    self._det_queue.get_nowait()
+                except queue.Empty:
+                    pass
+                self._det_queue.put_nowait(frame)
+    
+    def _next_result(self) -> Tuple[Optional[np.ndarray], List[ArucoToken]]:
+        """Wait for the next detection result; (None, []) once capture has stopped."""
+        while True:
+            try:
+                return self._res_queue.get(timeout=0.5)
+            except queue.Empty:
+                if not self._capturing:
+                    return None, []
+    
+    def _start_detection_worker(self):
+        """Start the background capture and detection threads."""
+        self._det_queue = queue.Queue(maxsize=1)
+        self._res_queue = queue.Queue(maxsize=1)
+        self._det_thread = threading.Thread(target=self._detection_worker, daemon=True)
+        self._det_thread.start()
+        self._capturing = True
+        self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._capture_thread.start()
+    
+    def _stop_detection_worker(self):
+        """Stop the background capture and detection threads."""
+        self._capturing = False
+        if self._capture_thread is not None:
+            self._capture_thread.join(timeout=2.0)
+            self._capture_thread = None
+        
+        if self._det_thread is None:
+            return
+        
+        # Drop pending work so the worker can reach the sentinel
+        for pending in (self._det_queue, self._res_queue):
+            try:
+                pending.get_nowait()
+            except queue.Empty:
+                pass
+        self._det_queue.put(None)
+        self._det_thread.join(timeout=2.0)
+        self._det_thread = None
+        
+        # Wake a reader that may still be waiting for a result
+        try:
+            self._res_queue.put_nowait((None, []))
+        except queue.Full:
+            pass
+    
     async def run_async(self, display: bool = True):
         """Main async tracking loop."""
         if not self.picam:
@@ -674,20 +1187,32 @@ class FoundryArucoTracker:
         self.running = True
         logger.info("Starting Foundry ArUco tracking... Press 'q' to quit, 'r' to recalibrate")
         
+        loop = asyncio.get_running_loop()
+        self._start_detection_worker()
+        frame_idx = 0
+        
+        # pollKey (OpenCV 4.5.1+) checks for input without waitKey's forced delay
+        poll_key = cv2.pollKey if hasattr(cv2, 'pollKey') else (lambda: cv2.waitKey(1))
+        
         try:
             while self.running:
-                frame = self.picam.capture_array()
-                detected_tokens = self.detect_aruco_markers(frame)
+                # Frames are captured and detected in the background; always
+                # work on the newest result
+                frame, detected_tokens = await loop.run_in_executor(None, self._next_result)
+                if frame is None:
+                    break
                 self.update_tracked_tokens(detected_tokens)
                 
                 # Send updates to Foundry
                 await self.send_foundry_updates()
                 
                 if display:
-                    overlay_frame = self.draw_overlay(frame)
-                    cv2.imshow("Foundry ArUco Tracker", overlay_frame)
+                    if frame_idx % self.display_every == 0:
+                        overlay_frame = self.draw_overlay(self.frame_to_display(frame))
+                        cv2.imshow("Foundry ArUco Tracker", overlay_frame)
+                    frame_idx += 1
                     
-                    key = cv2.waitKey(1) & 0xFF
+                    key = poll_key() & 0xFF
                     if key == ord('q'):
                         break
                     elif key == ord('r'):
@@ -704,6 +1229,7 @@ class FoundryArucoTracker:
     async def stop(self):
         """Stop the tracking system."""
         self.running = False
+        self._stop_detection_worker()
         await self.foundry.disconnect_websocket()
         if self.picam:
             self.picam.stop()
@@ -721,6 +1247,11 @@ def main():
     parser.add_argument("--surface-width", type=int, default=1000, help="Surface width in units")
     parser.add_argument("--surface-height", type=int, default=1000, help="Surface height in units")
     parser.add_argument("--no-display", action="store_true", help="Run without display window")
+    parser.add_argument("--binary-protocol", action="store_true",
+                        help="Send token updates as binary WebSocket frames instead of JSON")
+    parser.add_argument("--detect-scale", type=int, default=1,
+                        help="Downscale factor for marker detection (1 = full resolution; "
+                             "2 is faster but misses markers smaller than ~32px)")
     
     args = parser.parse_args()
     
@@ -734,6 +1265,8 @@ def main():
     
     # Create tracker
     tracker = FoundryArucoTracker(foundry_config, args.surface_width, args.surface_height)
+    tracker.detect_scale = max(1, args.detect_scale)
+    tracker.foundry.binary_protocol = args.binary_protocol
     
     # Initialize camera
     if not tracker.initialize_camera():
@@ -111,6 +111,7 @@ class ArucoTrackerModule {
         
         try {
             this.websocket = new WebSocket(wsUrl);
+            this.websocket.binaryType = "arraybuffer";
             
             this.websocket.onopen = () => {
                 console.log("ArUco Tracker | WebSocket connected to remote tracker");
@@ -130,7 +131,11 @@ class ArucoTrackerModule {
             };
             
             this.websocket.onmessage = (event) => {
-                this.handleWebSocketMessage(JSON.parse(event.data));
+                if (event.data instanceof ArrayBuffer) {
+                    this.handleWebSocketMessage(this.decodeBinaryMessage(event.data));
+                } else {
+                    this.handleWebSocketMessage(JSON.parse(event.data));
+                }
             };
             
             this.websocket.onclose = (event) => {
@@ -163,11 +168,47 @@ class ArucoTrackerModule {
         }
     }
 
+    decodeBinaryMessage(buffer) {
+        // Binary token batch from the tracker (--binary-protocol), little-endian:
+        // header <u16 type, u16 count>, then per token
+        // <u32 aruco_id, f32 x, f32 y, f32 confidence, u8 marker_type, u8 id_len, id bytes>
+        const view = new DataView(buffer);
+        const decoder = new TextDecoder();
+        const markerTypes = ['player', 'item', 'custom'];
+        const msgType = view.getUint16(0, true);
+        const count = view.getUint16(2, true);
+        if (msgType !== 1) {
+            return { type: `binary_${msgType}` };
+        }
+        
+        const updates = [];
+        let offset = 4;
+        for (let i = 0; i < count; i++) {
+            const idLength = view.getUint8(offset + 17);
+            updates.push({
+                aruco_id: view.getUint32(offset, true),
+                x: view.getFloat32(offset + 4, true),
+                y: view.getFloat32(offset + 8, true),
+                confidence: view.getFloat32(offset + 12, true),
+                marker_type: markerTypes[view.getUint8(offset + 16)] || 'custom',
+                token_id: decoder.decode(new Uint8Array(buffer, offset + 18, idLength))
+            });
+            offset += 18 + idLength;
+        }
+        return { type: "token_update_batch", updates };
+    }
+
     async handleWebSocketMessage(data) {
         switch (data.type) {
             case "token_update":
                 await this.updateTokenPosition(data);
                 break;
+            case "token_update_batch":
+                // Several token updates sent by the tracker in one message
+                for (const update of data.updates || []) {
+                    await this.updateTokenPosition({ ...update, scene_id: data.scene_id });
+                }
+                break;
             case "handshake":
                 console.log("ArUco Tracker | Received handshake from tracker");
                 if (data.marker_system === "aruco") {
@@ -11,96 +11,134 @@ python3 network_test.py --foundry-host 192.168.1.50 --foundry-port 30000
 """
 
 import asyncio
-import websockets
-import requests
 import argparse
 import socket
+import sys
 import time
+from functools import lru_cache
 from urllib.parse import urlparse
 
 
-def test_basic_connectivity(host, timeout=5):
+async def resolve_host(host):
+    """Resolve host to an IPv4 address once, falling back to the name itself."""
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+        return infos[0][4][0]
+    except OSError:
+        return host
+
+
+async def probe(host, port, timeout):
+    """Return True if a TCP connection to host:port succeeds within timeout."""
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+
+async def test_basic_connectivity(host, timeout=5, log=print):
     """Test basic network connectivity via ping-like socket test."""
-    print(f"Testing basic connectivity to {host}...")
+    log(f"Testing basic connectivity to {host}...")
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        result = sock.connect_ex((host, 80))  # Test with port 80
-        sock.close()
-        
-        if result == 0:
-            print("✓ Host is reachable")
+        if await probe(host, 80, timeout):  # Test with port 80
+            log("✓ Host is reachable")
             return True
         else:
-            print("✗ Host is not reachable")
+            log("✗ Host is not reachable")
             return False
     except Exception as e:
-        print(f"✗ Connection test failed: {e}")
+        log(f"✗ Connection test failed: {e}")
         return False
 
 
-def test_foundry_http(foundry_url, timeout=10):
+async def test_foundry_http(foundry_url, timeout=10, log=print):
     """Test Foundry HTTP API accessibility."""
-    print(f"Testing Foundry HTTP API at {foundry_url}...")
+    import aiohttp  # Deferred so --help and the other probes don't pay for it
+    
+    log(f"Testing Foundry HTTP API at {foundry_url}...")
     try:
-        response = requests.get(f"{foundry_url}/api/status", timeout=timeout)
-        if response.status_code == 200:
-            print("✓ Foundry HTTP API is accessible")
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+            # Only the status line matters: the body is never read, and the
+            # one-shot session shouldn't keep the socket alive
+            async with session.get(f"{foundry_url}/api/status",
+                                   headers={"Connection": "close"}) as response:
+                status = response.status
+        if status == 200:
+            log("✓ Foundry HTTP API is accessible")
             return True
         else:
-            print(f"⚠ Foundry HTTP returned status {response.status_code}")
+            log(f"⚠ Foundry HTTP returned status {status}")
             return False
-    except requests.exceptions.ConnectTimeout:
-        print("✗ Connection to Foundry timed out")
+    except asyncio.TimeoutError:
+        log("✗ Connection to Foundry timed out")
         return False
-    except requests.exceptions.ConnectionError:
-        print("✗ Could not connect to Foundry")
+    except aiohttp.ClientConnectionError:
+        log("✗ Could not connect to Foundry")
         return False
     except Exception as e:
-        print(f"✗ HTTP test failed: {e}")
+        log(f"✗ HTTP test failed: {e}")
         return False
 
 
-def test_websocket_port(host, port, timeout=10):
+async def test_websocket_port(host, port, timeout=10, log=print):
     """Test if WebSocket port is accessible."""
-    print(f"Testing WebSocket port {host}:{port}...")
+    log(f"Testing WebSocket port {host}:{port}...")
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        result = sock.connect_ex((host, port))
-        sock.close()
-        
-        if result == 0:
-            print("✓ WebSocket port is open")
+        if await probe(host, port, timeout):
+            log("✓ WebSocket port is open")
             return True
         else:
-            print("✗ WebSocket port is closed or filtered")
+            log("✗ WebSocket port is closed or filtered")
             return False
     except Exception as e:
-        print(f"✗ WebSocket port test failed: {e}")
+        log(f"✗ WebSocket port test failed: {e}")
         return False
 
 
 async def test_websocket_server(port, duration=30):
     """Start a simple WebSocket server to test Foundry can connect back."""
+    import websockets  # Only needed with --test-server
+    
     print(f"Starting test WebSocket server on port {port} for {duration} seconds...")
     print("Now try connecting from Foundry module or test with:")
     print(f"  wscat -c ws://$(hostname -I | awk '{{print $1}}'):{port}")
     
-    connections = set()
+    connection_count = 0
+    
+    async def drain(out_queue, websocket):
+        """Send queued replies so receiving never waits on a slow client."""
+        try:
+            while True:
+                message = await out_queue.get()
+                await websocket.send(message)
+        except websockets.exceptions.ConnectionClosed:
+            pass  # handle_client reports the disconnect
     
     async def handle_client(websocket, path):
+        nonlocal connection_count
         print(f"✓ Client connected from {websocket.remote_address}")
-        connections.add(websocket)
+        connection_count += 1
+        out_queue = asyncio.Queue(maxsize=64)
+        sender = asyncio.create_task(drain(out_queue, websocket))
         try:
-            await websocket.send("Hello from AruCo Token Tracker test server!")
+            out_queue.put_nowait("Hello from AruCo Token Tracker test server!")
             async for message in websocket:
                 print(f"Received: {message}")
-                await websocket.send(f"Echo: {message}")
+                try:
+                    out_queue.put_nowait(f"Echo: {message}")
+                except asyncio.QueueFull:
+                    print(f"⚠ Dropping echo to {websocket.remote_address} (send queue full)")
         except websockets.exceptions.ConnectionClosed:
             print(f"Client {websocket.remote_address} disconnected")
         finally:
-            connections.discard(websocket)
+            sender.cancel()
     
     try:
         server = await websockets.serve(handle_client, "0.0.0.0", port)
@@ -113,8 +151,8 @@ async def test_websocket_server(port, duration=30):
         server.close()
         await server.wait_closed()
         
-        if connections:
-            print(f"✓ Successfully handled {len(connections)} connection(s)")
+        if connection_count:
+            print(f"✓ Successfully handled {connection_count} connection(s)")
         else:
             print("⚠ No connections were received during test")
             
@@ -122,10 +160,20 @@ async def test_websocket_server(port, duration=30):
         print(f"✗ Failed to start WebSocket server: {e}")
 
 
+@lru_cache(maxsize=1)
 def get_local_ip():
-    """Get the local IP address of this machine."""
+    """Get the local IP address of this machine (looked up once)."""
+    try:
+        # The hostname usually resolves to the LAN address
+        local_ip = socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET)[0][4][0]
+        if not local_ip.startswith("127."):
+            return local_ip
+    except OSError:
+        pass
+    
     try:
-        # Connect to a remote address to determine local IP
+        # Otherwise (e.g. Raspberry Pi OS maps it to 127.0.1.1), connect a UDP
+        # socket to a remote address to find the outgoing interface
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         sock.connect(("8.8.8.8", 80))
         local_ip = sock.getsockname()[0]
@@ -135,6 +183,19 @@ def get_local_ip():
         return "localhost"
 
 
+def install_fast_event_loop():
+    """Use uvloop (or winloop on Windows) for asyncio if it is installed."""
+    try:
+        if sys.platform == "win32":
+            import winloop
+            winloop.install()
+        else:
+            import uvloop
+            uvloop.install()
+    except ImportError:
+        pass  # Stock asyncio event loop
+
+
 async def main():
     parser = argparse.ArgumentParser(description="Test network connectivity for Foundry ArUco Token Tracker")
     parser.add_argument("--foundry-host", required=True, help="Foundry VTT host IP or hostname")
@@ -153,15 +214,18 @@ async def main():
     print(f"WebSocket Port: {args.websocket_port}")
     print("-" * 60)
     
-    # Test 1: Basic connectivity
-    connectivity_ok = test_basic_connectivity(args.foundry_host)
-    
-    # Test 2: Foundry HTTP API
+    # Run all three tests concurrently so a dead host costs one timeout, not three:
+    # 1. basic connectivity, 2. Foundry HTTP API, 3. WebSocket port accessibility
     foundry_url = f"http://{args.foundry_host}:{args.foundry_port}"
-    http_ok = test_foundry_http(foundry_url)
-    
-    # Test 3: WebSocket port accessibility
-    websocket_ok = test_websocket_port(args.foundry_host, args.websocket_port)
+    host_ip = await resolve_host(args.foundry_host)  # Look the name up once for both probes
+    # Each test logs into its own buffer so the report keeps its usual order
+    logs = ([], [], [])
+    connectivity_ok, http_ok, websocket_ok = await asyncio.gather(
+        test_basic_connectivity(host_ip, log=logs[0].append),
+        test_foundry_http(foundry_url, log=logs[1].append),
+        test_websocket_port(host_ip, args.websocket_port, log=logs[2].append))
+    for lines in logs:
+        print("\n".join(lines))
     
     print("-" * 60)
     
@@ -194,4 +258,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    install_fast_event_loop()
     asyncio.run(main())
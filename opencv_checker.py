@@ -11,14 +11,41 @@ Usage: python3 check_opencv.py
 
 import sys
 
+try:
+    import cv2
+except ImportError as e:
+    cv2 = None
+    _CV2_IMPORT_ERROR = e
+
+
+def _new_api_expected() -> bool:
+    """Whether the installed OpenCV is 4.7+ (ArucoDetector / generateImageMarker APIs)."""
+    try:
+        major, minor = (int(part) for part in cv2.__version__.split('.')[:2])
+    except Exception:
+        return False  # OpenCV missing or an unparseable version string
+    return (major, minor) >= (4, 7)
+
+
+# Detection/generation API decision, evaluated once at import; other scripts can
+# import it instead of re-parsing cv2.__version__
+NEW_API = _new_api_expected()
+
+
 def check_opencv():
     """Check OpenCV installation and ArUco compatibility."""
     print("OpenCV ArUco Compatibility Checker")
     print("=" * 40)
     
     # Test basic OpenCV import
+    if cv2 is None:
+        print(f"✗ Failed to import OpenCV: {_CV2_IMPORT_ERROR}")
+        print("\nSolutions:")
+        print("  pip3 install opencv-python")
+        print("  sudo apt install python3-opencv  # (Raspberry Pi)")
+        return False
+    
     try:
-        import cv2
         print(f"✓ OpenCV imported successfully")
         opencv_version = cv2.__version__
         print(f"  Version: {opencv_version}")
@@ -31,12 +58,6 @@ def check_opencv():
         
         print(f"  Parsed: {opencv_major}.{opencv_minor}.{opencv_patch}")
         
-    except ImportError as e:
-        print(f"✗ Failed to import OpenCV: {e}")
-        print("\nSolutions:")
-        print("  pip3 install opencv-python")
-        print("  sudo apt install python3-opencv  # (Raspberry Pi)")
-        return False
     except Exception as e:
         print(f"✗ Unexpected error importing OpenCV: {e}")
         return False
@@ -63,7 +84,7 @@ def check_opencv():
     api_version = "legacy"
 
     # Check for new API (OpenCV 4.7+)
-    if opencv_major > 4 or (opencv_major == 4 and opencv_minor >= 7):
+    if NEW_API:
         try:
             parameters = cv2.aruco.DetectorParameters()
             print(f"✓ ArUco DetectorParameters() available (newer API)")
@@ -98,7 +119,7 @@ def check_opencv():
         import numpy as np
         
         # Create a simple test image
-        test_image = np.ones((400, 400), dtype=np.uint8) * 255
+        test_image = np.full((400, 400), 255, dtype=np.uint8)
         
         if api_version == "new":
             try:
@@ -123,7 +144,7 @@ def check_opencv():
         test_marker_id = 10
         marker_size = 100
         
-        if opencv_major > 4 or (opencv_major == 4 and opencv_minor >= 7):
+        if NEW_API:
             # Try new API first
             try:
                 marker_image = cv2.aruco.generateImageMarker(
@@ -132,14 +153,14 @@ def check_opencv():
                 generation_api = "new"
             except AttributeError:
                 # Fall back to legacy API
-                marker_image = np.ones((marker_size, marker_size), dtype=np.uint8) * 255
+                marker_image = np.empty((marker_size, marker_size), dtype=np.uint8)  # drawMarker fills every pixel
                 cv2.aruco.drawMarker(dictionary, test_marker_id, marker_size, 
                                    marker_image, borderBits=1)
                 print(f"✓ Legacy API marker generation successful (fallback)")
                 generation_api = "legacy"
         else:
             # Use legacy API
-            marker_image = np.ones((marker_size, marker_size), dtype=np.uint8) * 255
+            marker_image = np.empty((marker_size, marker_size), dtype=np.uint8)  # drawMarker fills every pixel
             cv2.aruco.drawMarker(dictionary, test_marker_id, marker_size, 
                                marker_image, borderBits=1)
             print(f"✓ Legacy API marker generation successful")
@@ -175,7 +196,7 @@ def check_opencv():
         print("• Parameters: cv2.aruco.DetectorParameters_create() function")
         print("• This is common on Raspberry Pi OS and works perfectly")
         print("• The tracker automatically detects and uses the correct APIs")
-    elif opencv_major >= 4 and opencv_minor >= 7:
+    elif NEW_API:
         print("• Your OpenCV version supports the new ArUco APIs")
         print("• Detection: cv2.aruco.ArucoDetector() class")
         print("• Generation: cv2.aruco.generateImageMarker() function")
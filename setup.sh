@@ -149,7 +149,7 @@ install_python_packages() {
             numpy>=1.19.0 \
             Pillow>=8.0.0 \
             websockets>=10.0 \
-            requests>=2.25.0
+            aiohttp>=3.8.0
         
         # Try to install OpenCV (may fail on some systems)
         if ! python3 -c "import cv2" 2>/dev/null; then
@@ -196,7 +196,7 @@ packages = [
     ('numpy', 'NumPy'),
     ('PIL', 'Pillow'),
     ('websockets', 'WebSockets'),
-    ('requests', 'Requests'),
+    ('aiohttp', 'aiohttp'),
 ]
 
 # Add picamera2 test for Raspberry Pi
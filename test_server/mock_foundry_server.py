@@ -28,6 +28,7 @@ import logging
 import time
 import uuid
 import socket
+import struct
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -46,6 +47,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Binary token update frames sent by the tracker with --binary-protocol
+# (same layout as aruco_tracker.py). Header: message type, token count. Each
+# token: aruco_id, x, y, confidence, marker type code, token_id byte length,
+# followed by the UTF-8 token_id.
+BINARY_MSG_TOKEN_UPDATE_BATCH = 1
+BINARY_HEADER = struct.Struct("<HH")
+BINARY_TOKEN = struct.Struct("<IfffBB")
+MARKER_TYPE_NAMES = ('player', 'item', 'custom')
+
+
+def decode_binary_batch(payload: bytes) -> List[Dict]:
+    """Decode a binary token update batch into update dicts (raises ValueError if malformed)."""
+    try:
+        message_type, count = BINARY_HEADER.unpack_from(payload, 0)
+        if message_type != BINARY_MSG_TOKEN_UPDATE_BATCH:
+            raise ValueError(f"unknown binary message type {message_type}")
+        
+        updates = []
+        offset = BINARY_HEADER.size
+        for _ in range(count):
+            aruco_id, x, y, confidence, type_code, id_length = BINARY_TOKEN.unpack_from(payload, offset)
+            offset += BINARY_TOKEN.size
+            token_id = payload[offset:offset + id_length].decode('utf-8')
+            offset += id_length
+            updates.append({
+                "aruco_id": aruco_id,
+                "token_id": token_id or None,
+                "x": int(x),
+                "y": int(y),
+                "confidence": confidence,
+                "marker_type": MARKER_TYPE_NAMES[type_code] if type_code < len(MARKER_TYPE_NAMES) else "custom"
+            })
+        return updates
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ValueError(f"malformed binary message: {e}") from e
+
 
 class MockToken:
     """Represents a token in the mock Foundry server."""
@@ -334,6 +371,16 @@ class MockFoundryServer:
                             "type": "error",
                             "message": "Invalid JSON"
                         }))
+                elif msg.type == aiohttp.WSMsgType.BINARY:
+                    # Token update batch from a tracker running with --binary-protocol
+                    try:
+                        updates = decode_binary_batch(msg.data)
+                    except ValueError as e:
+                        logger.warning(f"WebSocket: Invalid binary message from {client_info}: {e}")
+                        continue
+                    logger.info(f"WebSocket: Received binary token_update_batch ({len(updates)} tokens)")
+                    for update in updates:
+                        await self.apply_token_update(update)
                 elif msg.type == aiohttp.WSMsgType.ERROR:
                     logger.warning(f"WebSocket error from {client_info}: {ws.exception()}")
                     break
@@ -362,83 +409,93 @@ class MockFoundryServer:
         
         elif message_type == "token_update":
             # Handle token update from ArUco tracker
+            await self.apply_token_update(data)
+        
+        elif message_type == "token_update_batch":
+            # Several token updates batched into one message
             scene_id = data.get("scene_id", self.default_scene_id)
-            aruco_id = data.get("aruco_id")
-            token_id = data.get("token_id")
-            x = data.get("x", 0)
-            y = data.get("y", 0)
-            confidence = data.get("confidence", 1.0)
-            marker_type = data.get("marker_type", "unknown")
+            for update in data.get("updates", []):
+                await self.apply_token_update({**update, "scene_id": scene_id})
+        
+        else:
+            logger.warning(f"WebSocket: Unknown message type: {message_type}")
+    
+    async def apply_token_update(self, data: Dict):
+        """Apply a single ArUco token update and broadcast it."""
+        scene_id = data.get("scene_id", self.default_scene_id)
+        aruco_id = data.get("aruco_id")
+        token_id = data.get("token_id")
+        x = data.get("x", 0)
+        y = data.get("y", 0)
+        confidence = data.get("confidence", 1.0)
+        marker_type = data.get("marker_type", "unknown")
+        
+        logger.info(f"WebSocket: ArUco update - ID:{aruco_id} -> ({x}, {y}) confidence:{confidence:.2f}")
+        
+        # Find or create token
+        if scene_id in self.scenes:
+            scene = self.scenes[scene_id]
             
-            logger.info(f"WebSocket: ArUco update - ID:{aruco_id} -> ({x}, {y}) confidence:{confidence:.2f}")
+            # Try to find existing token
+            token = None
+            if token_id and token_id in scene.tokens:
+                token = scene.tokens[token_id]
+            else:
+                # Look for token by ArUco ID in flags
+                for t in scene.tokens.values():
+                    if t.flags.get("aruco_id") == aruco_id:
+                        token = t
+                        break
             
-            # Find or create token
-            if scene_id in self.scenes:
-                scene = self.scenes[scene_id]
+            if not token:
+                # Create new token
+                new_token_id = str(uuid.uuid4())
                 
-                # Try to find existing token
-                token = None
-                if token_id and token_id in scene.tokens:
-                    token = scene.tokens[token_id]
+                # Generate name based on marker type
+                if marker_type == 'player':
+                    player_num = aruco_id - 10 + 1
+                    name = f"Player_{player_num:02d}"
+                elif marker_type == 'item':
+                    item_names = {
+                        30: "Goblin", 31: "Orc", 32: "Skeleton", 33: "Dragon", 34: "Troll",
+                        35: "Wizard_Enemy", 36: "Beast", 37: "Demon", 40: "Treasure_Chest",
+                        41: "Magic_Item", 42: "Gold_Pile", 43: "Potion", 44: "Weapon",
+                        45: "Armor", 46: "Scroll", 47: "Key", 50: "NPC_Merchant",
+                        51: "NPC_Guard", 52: "NPC_Noble", 53: "NPC_Innkeeper", 54: "NPC_Priest",
+                        55: "Door", 56: "Trap", 57: "Fire_Hazard", 58: "Altar",
+                        59: "Portal", 60: "Vehicle", 61: "Objective"
+                    }
+                    name = item_names.get(aruco_id, f"Item_{aruco_id}")
                 else:
-                    # Look for token by ArUco ID in flags
-                    for t in scene.tokens.values():
-                        if t.flags.get("aruco_id") == aruco_id:
-                            token = t
-                            break
+                    name = f"Custom_{aruco_id}"
                 
-                if not token:
-                    # Create new token
-                    new_token_id = str(uuid.uuid4())
-                    
-                    # Generate name based on marker type
-                    if marker_type == 'player':
-                        player_num = aruco_id - 10 + 1
-                        name = f"Player_{player_num:02d}"
-                    elif marker_type == 'item':
-                        item_names = {
-                            30: "Goblin", 31: "Orc", 32: "Skeleton", 33: "Dragon", 34: "Troll",
-                            35: "Wizard_Enemy", 36: "Beast", 37: "Demon", 40: "Treasure_Chest",
-                            41: "Magic_Item", 42: "Gold_Pile", 43: "Potion", 44: "Weapon",
-                            45: "Armor", 46: "Scroll", 47: "Key", 50: "NPC_Merchant",
-                            51: "NPC_Guard", 52: "NPC_Noble", 53: "NPC_Innkeeper", 54: "NPC_Priest",
-                            55: "Door", 56: "Trap", 57: "Fire_Hazard", 58: "Altar",
-                            59: "Portal", 60: "Vehicle", 61: "Objective"
-                        }
-                        name = item_names.get(aruco_id, f"Item_{aruco_id}")
-                    else:
-                        name = f"Custom_{aruco_id}"
-                    
-                    token = MockToken(
-                        token_id=new_token_id,
-                        name=name,
-                        x=x, y=y,
-                        flags={"aruco_id": aruco_id, "marker_type": marker_type}
-                    )
-                    scene.tokens[new_token_id] = token
-                    self.stats["tokens_created"] += 1
-                    
-                    logger.info(f"WebSocket: Created new token {name} for ArUco {aruco_id}")
-                else:
-                    # Update existing token position
-                    old_pos = (token.x, token.y)
-                    token.update({"x": x, "y": y})
-                    self.stats["tokens_updated"] += 1
-                    
-                    if abs(old_pos[0] - x) > 5 or abs(old_pos[1] - y) > 5:  # Only log significant moves
-                        logger.info(f"WebSocket: Moved {token.name}: {old_pos} -> ({x}, {y})")
+                token = MockToken(
+                    token_id=new_token_id,
+                    name=name,
+                    x=x, y=y,
+                    flags={"aruco_id": aruco_id, "marker_type": marker_type}
+                )
+                scene.tokens[new_token_id] = token
+                self.stats["tokens_created"] += 1
                 
-                # Broadcast update to other clients
-                await self.broadcast_websocket({
-                    "type": "token_position_update",
-                    "scene_id": scene_id,
-                    "token": token.to_dict(),
-                    "aruco_id": aruco_id,
-                    "confidence": confidence
-                })
-        
-        else:
-            logger.warning(f"WebSocket: Unknown message type: {message_type}")
+                logger.info(f"WebSocket: Created new token {name} for ArUco {aruco_id}")
+            else:
+                # Update existing token position
+                old_pos = (token.x, token.y)
+                token.update({"x": x, "y": y})
+                self.stats["tokens_updated"] += 1
+                
+                if abs(old_pos[0] - x) > 5 or abs(old_pos[1] - y) > 5:  # Only log significant moves
+                    logger.info(f"WebSocket: Moved {token.name}: {old_pos} -> ({x}, {y})")
+            
+            # Broadcast update to other clients
+            await self.broadcast_websocket({
+                "type": "token_position_update",
+                "scene_id": scene_id,
+                "token": token.to_dict(),
+                "aruco_id": aruco_id,
+                "confidence": confidence
+            })
     
     # Web Interface Handlers
     